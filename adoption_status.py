@@ -0,0 +1,55 @@
+from models import db, User, Animal, AdoptionRequest
+
+# ---------------------- Adoption Status Resolution ----------------------
+# Animal.status / Animal.adopter_id are the source of truth for listings.
+# They are written in the same transaction as the approved AdoptionRequest,
+# kaya hindi na kailangang tingnan ang adoption requests tuwing magbabasa.
+
+AVAILABLE = 'Available'
+ADOPTED = 'Adopted'
+
+
+# Returns (animal_status, animal_adopter) keyed by animal id;
+# animal_adopter holds the adopting User, or None kung available pa.
+def resolve_adoption_status(animals):
+    animal_status = {a.id: a.status for a in animals}
+
+    # Adopters for the whole set in one query (skipped if none are adopted)
+    adopter_ids = {a.adopter_id for a in animals if a.adopter_id}
+    adopters = {}
+    if adopter_ids:
+        adopters = {u.id: u for u in User.query.filter(User.id.in_(adopter_ids))}
+
+    animal_adopter = {a.id: adopters.get(a.adopter_id) for a in animals}
+    return animal_status, animal_adopter
+
+
+def is_adopted(animal):
+    return animal.status == ADOPTED
+
+
+# ---------------------- Keeping the status in sync ----------------------
+# Call this before db.session.commit() of the route that approves the request.
+# Approved requests cannot be canceled, kaya walang daan pabalik sa Available.
+def mark_adopted(animal, user_id):
+    animal.status = ADOPTED
+    animal.adopter_id = user_id
+
+
+# Recompute status/adopter of every animal from the approved adoption requests
+# (one UPDATE, used by the migration and for repairs)
+def backfill_animal_status():
+    approved_user = db.select(AdoptionRequest.user_id)\
+                      .where(AdoptionRequest.animal_id == Animal.id,
+                             AdoptionRequest.status == 'approved')\
+                      .order_by(AdoptionRequest.id)\
+                      .limit(1)\
+                      .scalar_subquery()
+
+    db.session.execute(
+        db.update(Animal).values(
+            adopter_id=approved_user,
+            status=db.case((approved_user.is_not(None), ADOPTED), else_=AVAILABLE)
+        )
+    )
+    db.session.commit()
@@ -0,0 +1,70 @@
+from models import db, Animal, animal_age_years
+from adoption_status import AVAILABLE
+
+# ---------------------- Animal Search ----------------------
+# Server-side filtering for the flipbook, the shelter dashboard and
+# /api/animals. Searches are always inside one shelter: the
+# (shelter_id, lower(type), status) and (shelter_id, age) indexes narrow the
+# rows down, then breed/name are matched as case-insensitive substrings
+# (same behaviour as the old #breedSearch box, pero sa server na).
+
+SEARCH_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+# Reads the search filters from request.args (missing/invalid ones are ignored)
+def search_filters(args):
+    filters = {
+        'breed': args.get('breed', '').strip(),
+        'name': args.get('name', '').strip(),
+        'type': args.get('type', '').strip(),
+        'gender': args.get('gender', '').strip(),
+        'min_age': args.get('min_age', type=int),
+        'max_age': args.get('max_age', type=int),
+        'available': args.get('available') == '1',
+    }
+    return {key: value for key, value in filters.items() if value not in ('', None, False)}
+
+
+def search_animals(shelter_id, filters):
+    query = Animal.query.filter(Animal.shelter_id == shelter_id)
+    if 'type' in filters:
+        query = query.filter(db.func.lower(Animal.type) == filters['type'].lower())
+    if filters.get('available'):
+        query = query.filter(Animal.status == AVAILABLE)
+    if 'gender' in filters:
+        query = query.filter(db.func.lower(Animal.gender) == filters['gender'].lower())
+    if 'min_age' in filters:
+        query = query.filter(animal_age_years >= filters['min_age'])
+    if 'max_age' in filters:
+        query = query.filter(animal_age_years <= filters['max_age'])
+    if 'breed' in filters:
+        query = query.filter(db.func.lower(Animal.breed).contains(filters['breed'].lower(), autoescape=True))
+    if 'name' in filters:
+        query = query.filter(db.func.lower(Animal.name).contains(filters['name'].lower(), autoescape=True))
+    return query
+
+
+# Keyset page by id: returns (animals, next_cursor)
+def search_page(query, after=None, limit=SEARCH_PAGE_SIZE):
+    if after is not None:
+        query = query.filter(Animal.id > after)
+    animals = query.order_by(Animal.id).limit(limit + 1).all()
+    if len(animals) > limit:
+        animals = animals[:limit]
+        return animals, animals[-1].id
+    return animals, None
+
+
+def animal_json(animal):
+    return {
+        'id': animal.id,
+        'name': animal.name,
+        'breed': animal.breed,
+        'type': animal.type,
+        'gender': animal.gender,
+        'age': animal.age,
+        'status': animal.status,
+        'description': animal.description,
+        'image': animal.image1,
+    }
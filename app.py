@@ -1,17 +1,40 @@
-from flask import Flask, render_template, redirect, url_for, flash, request, session
-from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.utils import secure_filename
+from flask import Flask, render_template, redirect, url_for, flash, request, session, jsonify, abort
 import os
 from forms import UserRegisterForm, ShelterRegisterForm, LoginForm, AnimalForm, AdoptionForm, UserInfoForm
-from models import db, User, Shelter, Animal, AdoptionRequest, Notification
+from config import get_config
+from models import db, init_db, User, Shelter, Animal, AdoptionRequest, Job
+from adoption_status import resolve_adoption_status, is_adopted, mark_adopted
+from migrations import upgrade_database
+from notification_service import latest_notifications, notification_page, mark_read, get_unread_count, \
+                                 notify, notify_admin
+from jobs import enqueue, dispatch, job_status, start_worker
+from cascades import delete_animal_cascade
+from images import save_upload, image_url, release_images
+from assets import init_assets
+from flipbook import flipbook_window, shelter_details, FLIPBOOK_BATCH
+from fulltext import search as fulltext_search
+from catalog import catalog_page
+from page_cache import init_page_cache, cached, invalidate_shelter
+from versions import bump_version, page_validators, not_modified, add_validators
+from ratelimit import init_rate_limits, check_login_attempt, login_failed, login_succeeded, \
+                      is_unknown_email, remember_unknown_email, forget_unknown_email
+from passwords import init_password_hashing, hash_password, password_hasher, HashingBusy
+from principals import find_principals, verify_principal
+from instrumentation import init_instrumentation
+from markupsafe import Markup
+from animal_search import search_filters, search_animals, search_page, animal_json, SEARCH_PAGE_SIZE, MAX_PAGE_SIZE
 # ---------------------- Flask Setup ----------------------
 app = Flask(__name__)
-app.config['SECRET_KEY'] = 'supersecretkey'
-app.config['SQLALCHEMY_DATABASE_URI'] =  'sqlite:///pawssion.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['UPLOAD_FOLDER'] = os.path.join('static', 'images')
+app.config.from_object(get_config())  # profile from PAWSSION_CONFIG (config.py)
+
+init_db(app)
+init_assets(app)  # fingerprinted, cacheable static files (assets.py)
+init_page_cache(app)  # shared listing fragments (page_cache.py)
+init_password_hashing(app)  # scrypt off the request threads (passwords.py)
+init_rate_limits(app)  # login throttling + unknown-email cache (ratelimit.py)
+init_instrumentation(app)  # opt-in timing, SQL counts, /metrics (instrumentation.py)
+app.add_template_global(image_url)
 
-db.init_app(app)
 
 # ---------------------- Index ----------------------
 # route for homepage
@@ -24,21 +47,20 @@ def index():
 def register():
     form = UserRegisterForm()
     if form.validate_on_submit():
-        # I-check kung existing na ang email sa User o Shelter
-        existing_email = User.query.filter_by(email=request.form['email']).first() \
-                 or Shelter.query.filter_by(email=request.form['email']).first()
-        if existing_email:
+        # I-check kung existing na ang email sa User o Shelter, and the
+        # username, in one query (principals.py)
+        taken = find_principals(request.form['email'], request.form['username'])
+        if 'user' in taken or 'shelter' in taken:
             flash("Email already exists! Please use a different email.")
             return redirect(url_for('register'))
         
         # Check username uniqueness
-        existing_username = User.query.filter_by(username=request.form['username']).first()
-        if existing_username:
+        if 'username' in taken:
             flash("Username already exists! Please choose a different username.")
             return redirect(url_for('register'))
 
         # Hash the password bago i-save sa database para mas secure
-        hashed_pw = generate_password_hash(request.form['password'])
+        hashed_pw = hash_password(request.form['password'])
 
         # get user information in user registration form
         user = User(
@@ -50,15 +72,12 @@ def register():
         )
 
         db.session.add(user)
-        db.session.commit()
+        db.session.flush()  # para makuha ang user.id
 
         # notification for new users
-        note_user = Notification(
-            message="Account created successfully. Welcome!",
-            user_id=user.id
-        )
-        db.session.add(note_user)
+        notify("Account created successfully. Welcome!", user_id=user.id)
         db.session.commit()
+        forget_unknown_email(user.email)
 
         flash('Account created! Please login.')
         return redirect(url_for('login'))
@@ -71,23 +90,19 @@ def shelter_register():
     if form.validate_on_submit():
         website = form.website.data or None
 
-        rejected_shelter = Shelter.query.filter_by(email=request.form['email'], approved=False).first()
-        if rejected_shelter:
-            db.session.delete(rejected_shelter)
-            db.session.commit()
-    
-        existing_email_user = User.query.filter_by(email=request.form['email']).first()
-        existing_email_shelter = Shelter.query.filter(
-            Shelter.email == request.form['email'],
-            Shelter.approved != False  # ignore rejected shelters
-        ).first()
-
-        if existing_email_user or existing_email_shelter:
+        # Rejected shelters may register again with the same email
+        taken = find_principals(request.form['email'])
+        previous = taken.get('shelter')
+        if 'user' in taken or (previous and previous.approved is not False):
             flash("Email already exists! Please use a different email.")
             return redirect(url_for('shelter_register'))
 
+        if previous:
+            db.session.delete(db.session.get(Shelter, previous.id))
+            db.session.flush()  # frees the email before the new row is inserted
 
-        hashed_pw = generate_password_hash(request.form['password'])
+
+        hashed_pw = hash_password(request.form['password'])
         # Getting data in the form and save it to the database
         shelter = Shelter(
             name=request.form['name'],
@@ -102,17 +117,11 @@ def shelter_register():
             approved=None
         )
         db.session.add(shelter)
-        db.session.commit()
 
         # Notify admin about new shelters
-        admin_user = User.query.filter_by(role='admin').first()
-        if admin_user:
-            note = Notification(
-                message=f"New shelter registered: {shelter.name}. Pending approval.",
-                user_id=admin_user.id
-            )
-            db.session.add(note)
-            db.session.commit()
+        notify_admin(f"New shelter registered: {shelter.name}. Pending approval.")
+        db.session.commit()
+        forget_unknown_email(shelter.email)
 
         flash("Shelter registered! Waiting for admin approval.")
         return redirect(url_for('index'))
@@ -126,17 +135,34 @@ def login():
         email = form.email.data
         password = form.password.data
 
+        # Throttled before any query or hashing (ratelimit.py)
+        wait = check_login_attempt(request.remote_addr, email)
+        if wait:
+            flash("Too many login attempts. Please try again later.", "danger")
+            return render_template('login.html', form=form), 429, {'Retry-After': str(wait)}
+
+        # Recently looked up and wala talagang account: same answer, no queries
+        if is_unknown_email(email):
+            login_failed(email)
+            flash("Your shelter account has been deleted by admin.", "danger")
+            return redirect(url_for('login'))
+
+        # User/admin and shelter with this email, one query (principals.py)
+        principals = find_principals(email)
+
         # Check if User/Admin
-        user = User.query.filter_by(email=email).first()
-        if user and check_password_hash(user.password, password):
+        user = principals.get('user')
+        if user and verify_principal(user, password):
+            login_succeeded(email)
             session['user_id'] = user.id
             session['role'] = user.role
             return redirect(url_for('admin_dashboard') if user.role=='admin' else url_for('user_dashboard'))
 
         # Check if Shelter
-        shelter = Shelter.query.filter_by(email=email).first()
+        shelter = principals.get('shelter')
         if shelter:
-            if check_password_hash(shelter.password, password):
+            if verify_principal(shelter, password):
+                login_succeeded(email)
                 if shelter.approved is True:
                     # Shelter approved - login successful
                     session['user_id'] = shelter.id
@@ -150,14 +176,23 @@ def login():
                     flash("Your shelter account is pending admin approval.", "warning")
                     return render_template('login.html', form=form)
             else:
+                login_failed(email)
                 flash("Invalid credentials.", "danger")
                 return redirect(url_for('login'))
         else:
+            login_failed(email)
+            if user is None:
+                remember_unknown_email(email)
             # Shelter account deleted by admin 
             flash("Your shelter account has been deleted by admin.", "danger")
             return redirect(url_for('login'))
     return render_template('login.html', form=form)
 
+# Every hashing slot stayed taken for PASSWORD_HASH_QUEUE_TIMEOUT seconds
+@app.errorhandler(HashingBusy)
+def hashing_busy(error):
+    return "Server is busy, please try again in a moment.", 503, {'Retry-After': '2'}
+
 # ---------------------- Logout ----------------------
 @app.route('/logout')
 def logout():
@@ -173,30 +208,42 @@ def shelter_dashboard():
         return redirect(url_for('login'))
 
     shelter_id = session['user_id']
+
+    # Unchanged since the browser's copy -> 304 before any other query
+    validators = page_validators([('shelter', shelter_id), ('shelter_account', shelter_id)])
+    cached_response = not_modified(validators)
+    if cached_response:
+        return cached_response
+
     shelter = Shelter.query.get(shelter_id)
-    animals = Animal.query.filter_by(shelter_id=shelter_id).all()
     pending_requests = AdoptionRequest.query.join(Animal).filter(
         Animal.shelter_id == shelter_id,
         AdoptionRequest.status == 'pending'
     ).all()
-    notifications = Notification.query.filter_by(shelter_id=shelter_id).order_by(Notification.timestamp.desc()).all()
-    unread_count = Notification.query.filter_by(shelter_id=shelter_id, read=False).count()
-
-    # --- NEW: animal_status & animal_adopter ---
-    animal_status = {}
-    animal_adopter = {}
-    for a in animals:
-        approved = AdoptionRequest.query.filter_by(animal_id=a.id, status='approved').first()
-        if approved:
-            animal_status[a.id] = 'Adopted'
-            animal_adopter[a.id] = f"{approved.user.first_name} {approved.user.last_name}"  # name ng user
-        else:
-            animal_status[a.id] = 'Available'
-            animal_adopter[a.id] = None
+    notifications = latest_notifications('shelter', shelter_id)
+    unread_count = get_unread_count('shelter', shelter_id)
+
+    # First pages of "My Animals"; flip.js fetches the rest / search results
+    window = flipbook_window(shelter_id, {}, count=True)
 
-    return render_template('shelter_dashboard.html', user=shelter, animals=animals,
-                           pending_requests=pending_requests, notifications=notifications, 
-                           unread_count=unread_count, animal_status=animal_status, animal_adopter=animal_adopter)
+    page = render_template('shelter_dashboard.html', user=shelter,
+                           pending_requests=pending_requests, notifications=notifications,
+                           unread_count=unread_count, manage=True, **window)
+    return add_validators(page, validators)
+
+# Next pages / search results of the dashboard flipbook (JSON)
+@app.route('/shelter_dashboard/pages')
+def shelter_dashboard_pages():
+    if session.get('role') != 'shelter':
+        return jsonify(error="Access denied!"), 403
+
+    validators = page_validators([('shelter', session['user_id'])])
+    cached_response = not_modified(validators)
+    if cached_response:
+        return cached_response
+
+    return add_validators(flipbook_pages(session['user_id'], search_filters(request.args), manage=True),
+                          validators)
 
 @app.route('/user_dashboard')
 def user_dashboard():
@@ -205,15 +252,18 @@ def user_dashboard():
         flash("Access denied!")
         return redirect(url_for('login'))
 
-    user = User.query.get(session['user_id'])
+    validators = page_validators([('user', session['user_id'])])
+    cached_response = not_modified(validators)
+    if cached_response:
+        return cached_response
 
-    # Kunin lahat ng approved shelters para makita ng user
-    shelters = Shelter.query.filter_by(approved=True).all()
-    notifications = Notification.query.filter_by(user_id=user.id).order_by(Notification.timestamp.desc()).all()
+    user = User.query.get(session['user_id'])
+    notifications = latest_notifications('user', user.id)
 
     # Count unread notifications
-    unread_count = Notification.query.filter_by(user_id=user.id, read=False).count()
-    return render_template('user_dashboard.html', user=user, shelters=shelters, notifications=notifications, unread_count=unread_count)
+    unread_count = get_unread_count('user', user.id)
+    page = render_template('user_dashboard.html', user=user, notifications=notifications, unread_count=unread_count)
+    return add_validators(page, validators)
 
 @app.route('/admin_dashboard')
 def admin_dashboard():
@@ -223,11 +273,17 @@ def admin_dashboard():
     
     admin_id = session['user_id']
 
+    validators = page_validators([('user', admin_id)])
+    cached_response = not_modified(validators)
+    if cached_response:
+        return cached_response
+
     # Get all the notifications for admin only
-    notifications = Notification.query.filter_by(user_id=admin_id).order_by(Notification.timestamp.desc()).all()
-    unread_count = Notification.query.filter_by(user_id=admin_id, read=False).count()
+    notifications = latest_notifications('admin', admin_id)
+    unread_count = get_unread_count('admin', admin_id)
 
-    return render_template('admin_dashboard.html', notifications=notifications, unread_count=unread_count)
+    page = render_template('admin_dashboard.html', notifications=notifications, unread_count=unread_count)
+    return add_validators(page, validators)
 
 @app.route('/profile', methods=['GET', 'POST'])
 def user_profile():
@@ -235,6 +291,7 @@ def user_profile():
     form = UserInfoForm(obj=user)  # populate form with existing info
 
     if form.validate_on_submit():
+        renamed = (user.first_name, user.last_name) != (form.first_name.data, form.last_name.data)
         user.first_name = form.first_name.data
         user.last_name = form.last_name.data
         user.username = form.username.data
@@ -243,7 +300,16 @@ def user_profile():
         user.gender = form.gender.data
         user.address = form.address.data
         user.contact = form.contact.data
+        bump_version('user', user.id)
+        if renamed:
+            # Shelter dashboards show the adopter's name (flip_details.html), kaya
+            # the pages of every shelter this user adopted from change too
+            for shelter_id in db.session.scalars(
+                    db.select(Animal.shelter_id).where(Animal.adopter_id == user.id).distinct()):
+                invalidate_shelter(shelter_id)
         db.session.commit()
+        # The new address may be in the unknown-email cache from a failed login
+        forget_unknown_email(user.email)
         flash("Profile updated!")
         return redirect(url_for('user_profile'))
 
@@ -259,18 +325,15 @@ def notifications():
         flash("Access denied!")
         return redirect(url_for('login'))
 
-    # Map roles to the correct filter key
-    filter_key = 'user_id' if role in ['user', 'admin'] else 'shelter_id'
+    # One page of the feed, older pages via the ?before= cursor
+    notifications, next_cursor = notification_page(role, user_id, request.args.get('before'))
 
-    notifications = Notification.query.filter_by(**{filter_key: user_id})\
-                                      .order_by(Notification.timestamp.desc())\
-                                      .all()
-    
-    for note in notifications:
-        if not note.read:
-            note.read = True
-    db.session.commit()
-    return render_template('notifications.html', notifications=notifications)
+    page = render_template('notifications.html', notifications=notifications, next_cursor=next_cursor)
+
+    # Only the notifications on this page are marked as read (single UPDATE),
+    # after rendering so the commit doesn't expire the loaded rows
+    mark_read(notifications)
+    return page
 
 # ---------------------- Admin Managing new Shelters ----------------------
 @app.route('/admin/approved_shelters')
@@ -307,24 +370,14 @@ def approve_shelter(shelter_id):
 
     shelter = Shelter.query.get_or_404(shelter_id)
     shelter.approved = True
-    db.session.commit()
 
     # Notify admin
-    admin_user = User.query.filter_by(role='admin').first()
-    if admin_user:
-        note = Notification(
-            message=f"Approved Shelter: {shelter.name}.",
-            user_id=admin_user.id
-        )
-        db.session.add(note)
-        db.session.commit()
+    notify_admin(f"Approved Shelter: {shelter.name}.")
 
     # Notify shelter
-    notif = Notification(
-        message="Your shelter has been approved! You can now log in and access your dashboard.",
-        shelter_id=shelter.id
-    )
-    db.session.add(notif)
+    notify("Your shelter has been approved! You can now log in and access your dashboard.",
+           shelter_id=shelter.id)
+    invalidate_shelter(shelter.id, listing=True)  # shelter list + its pages
     db.session.commit()
 
     flash("Shelter approved!")
@@ -340,17 +393,11 @@ def reject_shelter(shelter_id):
 
     # Mark as rejected
     shelter.approved = False
-    db.session.commit()
 
     # Notify admin
-    admin_user = User.query.filter_by(role='admin').first()
-    if admin_user:
-        note = Notification(
-            message=f"Shelter rejected: {shelter.name}.",
-            user_id=admin_user.id
-        )
-        db.session.add(note)
-        db.session.commit()
+    notify_admin(f"Shelter rejected: {shelter.name}.")
+    invalidate_shelter(shelter.id, listing=True)
+    db.session.commit()
 
     flash(f"{shelter.name} has been rejected.", "danger")
     return redirect(url_for('admin_pending_shelters'))
@@ -364,34 +411,33 @@ def delete_shelter(shelter_id):
 
     shelter = Shelter.query.get_or_404(shelter_id)
 
-    # Delete all adoption requests for animals of this shelter
-    animals = Animal.query.filter_by(shelter_id=shelter.id).all()
-    for animal in animals:
-        # Notify users whose adoption requests will be deleted
-        adoption_requests = AdoptionRequest.query.filter_by(animal_id=animal.id).all()
-        for req in adoption_requests:
-            db.session.add(Notification(
-                user_id=req.user_id,
-                message=f"Your adoption request for {animal.name} has been canceled because the shelter '{shelter.name}' was deleted."
-            ))
-            db.session.delete(req)  # Delete the adoption request
-
-        # Delete the animal
-        db.session.delete(animal)
-
-    # Notify admin about the deletion
-    admin_user = User.query.filter_by(role='admin').first()
-    if admin_user:
-        db.session.add(Notification(
-            user_id=admin_user.id,
-            message=f"The shelter '{shelter.name}' and all its animals were successfully deleted."
-        ))
-
-    # Finally, delete the shelter
-    db.session.delete(shelter)
+    shelter_name = shelter.name
+
+    # The cascade runs in the background (cascades.delete_shelter_cascade)
+    job = enqueue('delete_shelter', shelter_id=shelter.id)
     db.session.commit()
+    job_id = job.id
+    dispatch(job_id)
+
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(job_id=job_id, status_url=url_for('admin_job_status', job_id=job_id)), 202
+    flash(f"Deleting {shelter_name} in the background (job #{job_id}).")
     return redirect(url_for('admin_dashboard'))
 
+@app.route('/admin/jobs/<int:job_id>')
+def admin_job_status(job_id):
+    if session.get('role') != 'admin':
+        return jsonify(error="Access denied!"), 403
+    job = Job.query.get_or_404(job_id)
+    return jsonify(job_status(job))
+
+# Password hashing pool: in-flight / queued hashes, rejections (passwords.py)
+@app.route('/admin/password_hashing')
+def admin_password_hashing():
+    if session.get('role') != 'admin':
+        return jsonify(error="Access denied!"), 403
+    return jsonify(password_hasher().stats())
+
 # ---------------------- Shelter Adoption ----------------------
 @app.route('/shelter/adoption_requests')
 def shelter_adoption_requests():
@@ -401,10 +447,11 @@ def shelter_adoption_requests():
 
     shelter_id = session['user_id']
     # Query all pending adoption requests for animals belonging to this shelter
+    # Animal and requester come with the same query (walang query per row)
     pending_requests = AdoptionRequest.query.join(Animal).filter(
         Animal.shelter_id == shelter_id,
         AdoptionRequest.status == 'pending'
-    ).all()
+    ).options(db.contains_eager(AdoptionRequest.animal), db.joinedload(AdoptionRequest.user)).all()
     return render_template('shelter_adoption_requests.html', pending_requests=pending_requests)
 
 # ---------------------- Shelter Approved Adoption Requests ----------------------
@@ -418,7 +465,8 @@ def shelter_approved_adoptions():
     approved_adoptions = AdoptionRequest.query.join(Animal).filter(
         Animal.shelter_id == shelter_id,
         AdoptionRequest.status == 'approved'
-    ).order_by(AdoptionRequest.timestamp.desc()).all()
+    ).options(db.contains_eager(AdoptionRequest.animal), db.joinedload(AdoptionRequest.user))\
+     .order_by(AdoptionRequest.timestamp.desc()).all()
     return render_template('approved_adoption.html', approved_adoptions=approved_adoptions)
 
 # ---------------------- View Details of a Specific detail Adoption Request in Pending ----------------------
@@ -473,29 +521,28 @@ def shelter_approve_adoption(request_id):
     adoption.status = "approved"
 
     animal = adoption.animal  # Para madaling gamitin
+    mark_adopted(animal, adoption.user_id)  # same transaction as the approval
 
     # 2. Find OTHER pending requests for the same animal
     other_requests = AdoptionRequest.query.filter(
         AdoptionRequest.animal_id == animal.id,
         AdoptionRequest.id != adoption.id,
         AdoptionRequest.status == "pending"
-    ).all()
-
-    # 3. Cancel all other requests + send notification to each user
-    for req in other_requests:
-        req.status = "canceled"
+    )
+    other_user_ids = [user_id for (user_id,) in other_requests.with_entities(AdoptionRequest.user_id)]
 
-        db.session.add(Notification(
-            user_id=req.user_id,
-            message=f"Dear {adoption.animal.shelter.name}, your adoption request for {animal.name} was cancelled as another request was approved."
-        ))
+    # 3. Cancel all other requests (one UPDATE) + send notification to each user
+    other_requests.update({'status': "canceled"}, synchronize_session=False)
+    for user_id in other_user_ids:
+        notify(f"Dear {adoption.animal.shelter.name}, your adoption request for {animal.name} was cancelled as another request was approved.",
+               user_id=user_id)
 
     # 4. Notify the approved user
-    db.session.add(Notification(
-        user_id=adoption.user_id,
-        message=f"Your adoption request for {animal.name} was APPROVED by {animal.shelter.name}."
-    ))
+    notify(f"Your adoption request for {animal.name} was APPROVED by {animal.shelter.name}.",
+           user_id=adoption.user_id)
 
+    invalidate_shelter(animal.shelter_id)  # status changed to Adopted
+    bump_version('shelter_account', shelter_id)  # pending requests on the dashboard
     db.session.commit()
 
     flash("Adoption approved. Other requests have been automatically canceled and notified.")
@@ -517,10 +564,9 @@ def shelter_reject_adoption(request_id):
     adoption.status = "rejected"  # Set status to rejected
 
     # Create a notification for the user
-    db.session.add(Notification(
-        user_id=adoption.user_id,
-        message=f"Your adoption request for {adoption.animal.name} was REJECTED by {adoption.animal.shelter.name} shelter."
-    ))
+    notify(f"Your adoption request for {adoption.animal.name} was REJECTED by {adoption.animal.shelter.name} shelter.",
+           user_id=adoption.user_id)
+    bump_version('shelter_account', shelter_id)
     db.session.commit()
     flash("Adoption rejected.")
     return redirect(url_for('shelter_adoption_requests'))
@@ -560,15 +606,11 @@ def adopt(animal_id):
         db.session.add(adoption)
 
         # Notify the shelter about the new adoption request
-        db.session.add(Notification(
-            message=f"{user.first_name} {user.last_name} requested to adopt {animal.name or animal.type}",
-            shelter_id=animal.shelter.id
-        ))
+        notify(f"{user.first_name} {user.last_name} requested to adopt {animal.name or animal.type}",
+               shelter_id=animal.shelter_id)
 
-        db.session.add(Notification(
-            user_id=user.id,
-            message=f"Your adoption request for {animal.name} has been submitted and is now pending approval."
-        ))
+        notify(f"Your adoption request for {animal.name} has been submitted and is now pending approval.",
+               user_id=user.id)
 
         db.session.commit()
         flash("Adoption request submitted!")
@@ -586,8 +628,11 @@ def post_animal():
         if not file or not file.filename:
             flash("Please upload an image!")
             return redirect(request.url)
-        filename = secure_filename(file.filename)
-        file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))  # Save image
+        try:
+            filename = save_upload(file)  # Save resized WebP variants (images.py)
+        except ValueError as e:
+            flash(str(e))
+            return redirect(request.url)
 
         # Creating new animal record
         animal = Animal(
@@ -601,6 +646,7 @@ def post_animal():
             shelter_id=session['user_id']   # Link animal to logged-in shelter
         )
         db.session.add(animal)
+        invalidate_shelter(animal.shelter_id)
         db.session.commit()
         flash("Animal posted successfully!")
         return redirect(url_for('shelter_dashboard'))
@@ -618,8 +664,12 @@ def edit_animal(animal_id):
         file = request.files.get('image1')   # Handle new image
         if not file or not file.filename:
             return redirect(request.url)
-        filename = secure_filename(file.filename)
-        file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+        try:
+            filename = save_upload(file)
+        except ValueError as e:
+            flash(str(e))
+            return redirect(request.url)
+        old_image = animal.image1
         animal.image1 = filename   # Update image
 
         # Update other details
@@ -629,6 +679,11 @@ def edit_animal(animal_id):
         animal.breed = form.breed.data
         animal.gender = form.gender.data
         animal.description = form.description.data
+
+        # Remove the previous image once no animal uses it
+        if old_image != filename:
+            release_images([old_image])
+        invalidate_shelter(animal.shelter_id)
         db.session.commit()
         flash("Animal updated successfully.", "success")
         return redirect(url_for('shelter_dashboard'))
@@ -651,29 +706,15 @@ def delete_animal(animal_id):
         return redirect(url_for('shelter_dashboard'))
 
     # I-check kung may existing na APPROVED adoption para sa animal
-    approved_request = AdoptionRequest.query.filter_by(animal_id=animal.id, status='approved').first()
-    if approved_request:
+    if is_adopted(animal):
         flash("This animal already has an APPROVED adoption. Cannot delete.", "warning")
         return redirect(url_for('shelter_dashboard'))
 
-     # Kunin lahat ng PENDING adoption requests
-    pending_requests = AdoptionRequest.query.filter_by(
-        animal_id=animal.id,
-        status='pending'
-    ).all()
-
-    # Notify users na may pending request
-    for request in pending_requests:
-        notification = Notification(
-            user_id=request.user_id,
-            shelter_id=animal.shelter_id,
-            message=f"Your adoption request for '{animal.name}' was cancelled because the animal was removed by the shelter."
-        )
-        db.session.add(notification)
-
-    # Kung wala pang approved adoption, delete ang lahat ng adoption requests sa animal
-    AdoptionRequest.query.filter_by(animal_id=animal.id).delete()
-    db.session.delete(animal)
+    # Kung wala pang approved adoption, delete ang animal at lahat ng adoption requests nito;
+    # users na may PENDING request are notified (cascades.delete_animal_cascade)
+    shelter_id = animal.shelter_id
+    delete_animal_cascade(animal)
+    invalidate_shelter(shelter_id)
     db.session.commit()
     flash("Animal deleted successfully.", "success")
     return redirect(url_for('shelter_dashboard'))
@@ -684,8 +725,24 @@ def shelter_list():
     if session.get('role') != 'user':
         flash("Access denied!")
         return redirect(url_for('index'))
-    shelters = Shelter.query.filter_by(approved=True).all()
-    return render_template('shelter_list.html', shelters=shelters)
+
+    # Same list for every user; re-rendered only after a shelter is approved/rejected/deleted
+    shelter_items = cached(('shelter_list',), [('shelters', None)], lambda: render_template(
+        'shelter_list_items.html', shelters=Shelter.query.filter_by(approved=True).all()))
+    return render_template('shelter_list.html', shelter_items=Markup(shelter_items))
+
+# ---------------------- Browse All Adoptable Animals ----------------------
+# Every available animal across approved shelters, newest first (catalog.py)
+@app.route('/browse')
+def browse_animals():
+    if session.get('role') != 'user':
+        flash("Access denied!")
+        return redirect(url_for('index'))
+
+    animal_type = request.args.get('type', '').strip()
+    entries, next_cursor = catalog_page(animal_type, request.args.get('after', type=int))
+    return render_template('browse.html', entries=entries, animal_type=animal_type,
+                           next_cursor=next_cursor)
 
 # ---------------------- Animal Flip View for User ---------------------------
 @app.route('/view_shelter/<int:shelter_id>/<string:animal_type>')
@@ -694,42 +751,98 @@ def view_shelter_type(shelter_id, animal_type):
         flash("Please log in to view animals.")
         return redirect(url_for('login'))
 
-    shelter = Shelter.query.get_or_404(shelter_id)
-
-    # Get all animals of this type
-    animals = Animal.query.filter(
-        Animal.shelter_id == shelter.id,
-        db.func.lower(Animal.type) == animal_type.lower()
-    ).all()
+    # Same shelter version and viewer as the browser's copy -> 304, no queries
+    validators = page_validators([('shelter', shelter_id)])
+    cached_response = not_modified(validators)
+    if cached_response:
+        return cached_response
 
-    animal_status = {}   # 'Available' or 'Adopted'
-    animal_adopter = {}  # user_id of the adopter
+    # Shelter details and animal windows are cached per shelter (page_cache.py)
+    shelter = shelter_details(shelter_id)
+    if shelter is None:
+        abort(404)
 
-    for a in animals:
-        approved_request = AdoptionRequest.query.filter_by(animal_id=a.id, status='approved').first()
-        if approved_request:
-            animal_status[a.id] = 'Adopted'
-            animal_adopter[a.id] = approved_request.user_id
-        else:
-            animal_status[a.id] = 'Available'
-            animal_adopter[a.id] = None
+    # Only the first few animals of this type; the rest are fetched while flipping
+    available_only = request.args.get('available') == '1'
+    filters = {'type': animal_type, 'available': True} if available_only else {'type': animal_type}
+    window = flipbook_window(shelter_id, filters, count=True)
 
-    return render_template(
+    page = render_template(
         'animal_flip_view.html',
         shelter=shelter,
-        animals=animals,
         animal_type=animal_type,
-        animal_status=animal_status,
-        animal_adopter=animal_adopter
+        available_only=available_only,
+        **window
+    )
+    return add_validators(page, validators)
+
+# Next pages / search results of the flipbook (JSON), after animal id ?after=
+@app.route('/view_shelter/<int:shelter_id>/<string:animal_type>/pages')
+def view_shelter_type_pages(shelter_id, animal_type):
+    if 'user_id' not in session:
+        return jsonify(error="Please log in to view animals."), 401
+
+    validators = page_validators([('shelter', shelter_id)])
+    cached_response = not_modified(validators)
+    if cached_response:
+        return cached_response
+
+    filters = dict(search_filters(request.args), type=animal_type)
+    return add_validators(flipbook_pages(shelter_id, filters), validators)
+
+
+# Renders a batch of flipbook pages; without ?after= (a new search) the
+# details of the first match are included for the welcome page
+def flipbook_pages(shelter_id, filters, manage=False):
+    after = request.args.get('after', type=int)
+    context = dict(flipbook_window(shelter_id, filters, after, FLIPBOOK_BATCH), manage=manage)
+    next_cursor = context['next_cursor']
+    return jsonify(
+        html=render_template('flip_pages.html', **context),
+        first_html=render_template('flip_details.html', animal=context['first_animal'], **context)
+                   if after is None else None,
+        pages=len(context['page_animals']),
+        next_cursor=next_cursor
     )
 
+# ---------------------- Full-text Search ----------------------
+# GET /api/search?q=golden retriever&after=<next_cursor>
+# Animals and shelters of approved shelters, best matches first (fulltext.py)
+@app.route('/api/search')
+def fulltext_search_api():
+    if 'user_id' not in session:
+        return jsonify(error="Please log in to search."), 401
+
+    results, next_cursor = fulltext_search(request.args.get('q', ''), request.args.get('after'))
+    return jsonify(results=results, next_cursor=next_cursor)
+
+# ---------------------- Animal Search API ----------------------
+# GET /api/animals?shelter_id=1&breed=lab&gender=female&min_age=1&max_age=5&available=1&after=<id>
+@app.route('/api/animals')
+def search_animals_api():
+    if 'user_id' not in session:
+        return jsonify(error="Please log in to search animals."), 401
+
+    shelter_id = request.args.get('shelter_id', type=int)
+    if shelter_id is None:
+        return jsonify(error="shelter_id is required."), 400
+    # Shelters can search their own listings; everyone else only approved shelters
+    if not (session.get('role') == 'shelter' and session['user_id'] == shelter_id):
+        if not db.session.query(Shelter.id).filter_by(id=shelter_id, approved=True).first():
+            return jsonify(error="Shelter not found."), 404
+
+    limit = min(request.args.get('limit', SEARCH_PAGE_SIZE, type=int), MAX_PAGE_SIZE)
+    query = search_animals(shelter_id, search_filters(request.args))
+    animals, next_cursor = search_page(query, request.args.get('after', type=int), max(limit, 1))
+    return jsonify(animals=[animal_json(a) for a in animals], next_cursor=next_cursor)
+
 @app.route('/view_animal/<int:animal_id>')
 def view_animal(animal_id):
     animal = Animal.query.get_or_404(animal_id)
 
     # I-check kung adopted na ang animal
-    approved_request = AdoptionRequest.query.filter_by(animal_id=animal.id, status='approved').first()
-    status = 'Adopted' if approved_request else 'Available'
+    animal_status, _ = resolve_adoption_status([animal])
+    status = animal_status[animal.id]
     return render_template('animal_detail.html', animal=animal, status=status)
 
 # User Adoption Requests List
@@ -744,7 +857,7 @@ def user_adoption_requests():
     requests = AdoptionRequest.query.filter(
         AdoptionRequest.user_id == user_id,
         AdoptionRequest.status.in_(["pending", "approved"])
-    ).all()
+    ).options(db.joinedload(AdoptionRequest.animal).joinedload(Animal.shelter)).all()
     
     return render_template('user_adoption_requests.html', requests=requests)
 
@@ -771,11 +884,15 @@ def cancel_adoption_request(request_id):
         flash("Access denied!")
         return redirect(url_for('user_dashboard'))
 
+    # Approved requests are what set Animal.status to Adopted, kaya bawal i-cancel;
+    # deleting a pending one leaves the animal's status untouched.
     if req.status == 'approved':
         flash("This adoption request has been approved and cannot be canceled.")
         return redirect(url_for('user_adoption_requests'))
 
-    # Delete the request
+    # Delete the request; both dashboards list it
+    bump_version('user', req.user_id)
+    bump_version('shelter_account', req.animal.shelter_id)
     db.session.delete(req)
     db.session.commit()
 
@@ -786,15 +903,20 @@ def cancel_adoption_request(request_id):
 if __name__ == "__main__":
     with app.app_context():
         db.create_all()
+        upgrade_database()
         # default admin
         if not User.query.filter_by(email='admin@pawssion.com').first():
             admin_user = User(
                 username="admin",
                 email="admin@pawssion.com",
-                password=generate_password_hash("admin123"),
+                password=hash_password("admin123"),
                 role="admin"
             )
             db.session.add(admin_user)
             db.session.commit()
 
+    # Resume queued jobs (only in the reloader's serving process)
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_worker(app)
+
     app.run(debug=True)
\ No newline at end of file
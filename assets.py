@@ -0,0 +1,158 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import sys
+import tempfile
+from flask import abort, current_app, request, send_from_directory
+from werkzeug.security import safe_join
+from images import is_content_addressed
+
+try:
+    import brotli
+except ImportError:  # brotli not installed: gzip variants only
+    brotli = None
+
+# ---------------------- Static Assets ----------------------
+# url_for('static', filename=...) adds ?v=<content hash> to every static URL.
+# A request whose v matches the file's current hash is cached by the browser
+# for a year (immutable), kaya hindi na nagre-revalidate ang style.css/flip.js
+# sa bawat page ng flipbook. When the file changes, its hash (and URL) changes.
+# Requests without a matching v get an ETag and are revalidated (304).
+# CSS/JS are served from precompressed .br/.gz files when the browser accepts
+# them; build these with `python assets.py` (or COMPRESS_STATIC_ON_START).
+
+FINGERPRINT_LENGTH = 12
+IMMUTABLE_MAX_AGE = 31536000  # one year
+CHUNK_SIZE = 64 * 1024
+
+# Images and MP3s are already compressed
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.map')
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]  # preferred first
+
+_versions = {}  # path -> ((mtime, size), hash)
+
+
+def asset_version(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _versions.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    version = digest.hexdigest()[:FINGERPRINT_LENGTH]
+    _versions[path] = (key, version)
+    return version
+
+
+def add_fingerprint(endpoint, values):
+    if endpoint != 'static' or 'v' in values:
+        return
+    filename = values.get('filename', '').lstrip('/')
+    values['filename'] = filename
+    if is_content_addressed(filename):
+        return  # the name already is the hash
+    path = safe_join(current_app.static_folder, filename)
+    version = path and asset_version(path)
+    if version:
+        values['v'] = version
+
+
+# A .gz/.br file is only used if it is at least as new as the original, para
+# hindi ma-serve ang lumang CSS after editing style.css
+def is_fresh(variant, path):
+    try:
+        return os.stat(variant).st_mtime_ns >= os.stat(path).st_mtime_ns
+    except OSError:
+        return False
+
+
+def precompressed(path):
+    if not path.endswith(COMPRESSIBLE):
+        return None, ''
+    for encoding, suffix in ENCODINGS:
+        if request.accept_encodings[encoding] and is_fresh(path + suffix, path):
+            return encoding, suffix
+    return None, ''
+
+
+# Replaces Flask's static view
+def static_file(filename):
+    folder = current_app.static_folder
+    path = safe_join(folder, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    fingerprinted = is_content_addressed(filename) or request.args.get('v') == asset_version(path)
+    encoding, suffix = precompressed(path)
+    response = send_from_directory(
+        folder, filename + suffix,
+        mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+        max_age=IMMUTABLE_MAX_AGE if fingerprinted else None,
+    )
+    if encoding:
+        response.content_encoding = encoding
+    if path.endswith(COMPRESSIBLE):
+        response.vary.add('Accept-Encoding')
+    if fingerprinted:
+        response.cache_control.immutable = True
+    return response
+
+
+def init_assets(app):
+    app.url_defaults(add_fingerprint)
+    app.view_functions['static'] = static_file
+    if app.config.get('COMPRESS_STATIC_ON_START'):
+        compress_assets(app.static_folder)
+
+
+# ---------------------- Precompression ----------------------
+def write_atomic(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def compressors():
+    yield '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data, quality=11)
+
+
+# python assets.py [folder]  - writes .gz (and .br) next to every CSS/JS file
+def compress_assets(folder):
+    built = 0
+    for root, dirs, files in os.walk(folder):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            for suffix, compress in compressors():
+                if is_fresh(path + suffix, path):
+                    continue
+                compressed = compress(data)
+                if len(compressed) >= len(data):
+                    continue  # walang saysay kung hindi lumiit
+                write_atomic(path + suffix, compressed)
+                built += 1
+    return built
+
+
+if __name__ == '__main__':
+    folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    print(f"Wrote {compress_assets(folder)} compressed files in {folder}"
+          + ("" if brotli else " (gzip only: pip install brotli for .br)"))
@@ -0,0 +1,358 @@
+"""Time the key routes through the Flask test client and write the results to JSON.
+
+    python benchmark.py                                   # generated 'small' dataset
+    python benchmark.py --scale medium --iterations 200
+    python benchmark.py --database /tmp/big.db            # copy of a datagen.py database
+    python benchmark.py --compare benchmarks/old.json benchmarks/new.json
+
+The database is a throwaway: a dataset generated by datagen.py (same --seed
+and sizes, same data) or a copy of the --database SQLite file, so the write
+routes (approve/reject, delete cascades) never touch real data. Images are
+served from a temporary copy of static/images for the same reason.
+
+Read routes are requested --warmup times, then timed --iterations times.
+Write routes are timed --write-iterations times, each on a fresh row, and
+stop early when the dataset runs out of rows for them. For every route the
+JSON has latency percentiles (ms), throughput (requests/s, one client) and
+SQL statements per request, plus the git commit, dataset sizes and
+settings, so runs from different commits can be compared with --compare.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import datagen
+from models import db, User, Shelter, Animal, AdoptionRequest, Notification
+from notification_service import feed_query, encode_cursor, unread_cache, admin_cache, NOTIFICATIONS_PER_PAGE
+from versions import version_cache
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PERCENTILES = (50, 90, 95, 99)
+
+# ---------------------- Routes ----------------------
+# role: who is logged in ('user', 'shelter' or 'admin'); target(ctx) returns
+# the URL (and form data for POSTs) and runs before the timer starts. Write
+# routes raise Exhausted when there is no row left to use.
+Scenario = namedtuple('Scenario', 'name role method target write')
+
+
+class Exhausted(Exception):
+    pass
+
+
+def required(value):
+    if value is None:
+        raise Exhausted()
+    return value
+
+
+def pending_request(ctx):
+    return required(db.session.query(db.func.min(AdoptionRequest.id)).join(Animal).filter(
+        Animal.shelter_id == ctx['shelter'], Animal.status == 'Available',
+        AdoptionRequest.status == 'pending').scalar())
+
+
+def available_animal(ctx):
+    return required(db.session.query(db.func.max(Animal.id)).filter(
+        Animal.shelter_id == ctx['shelter'], Animal.status == 'Available').scalar())
+
+
+def pending_shelter(ctx):
+    return required(db.session.query(db.func.min(Shelter.id)).filter(Shelter.approved.is_(None)).scalar())
+
+
+# Biggest remaining shelter other than the one being benchmarked
+def shelter_to_delete(ctx):
+    return required(db.session.query(Shelter.id).join(Animal).filter(
+        Shelter.approved.is_(True), Shelter.id != ctx['shelter']
+    ).group_by(Shelter.id).order_by(db.func.count().desc(), Shelter.id).limit(1).scalar())
+
+
+SCENARIOS = [
+    # Dashboards
+    Scenario('user_dashboard', 'user', 'get', lambda ctx: '/user_dashboard', False),
+    Scenario('shelter_dashboard', 'shelter', 'get', lambda ctx: '/shelter_dashboard', False),
+    Scenario('admin_dashboard', 'admin', 'get', lambda ctx: '/admin_dashboard', False),
+    Scenario('shelter_adoption_requests', 'shelter', 'get', lambda ctx: '/shelter/adoption_requests', False),
+    # Flipbook
+    Scenario('flipbook', 'user', 'get', lambda ctx: f"/view_shelter/{ctx['shelter']}/dog", False),
+    Scenario('flipbook_pages', 'user', 'get', lambda ctx: f"/view_shelter/{ctx['shelter']}/dog/pages", False),
+    Scenario('flipbook_pages_after', 'user', 'get',
+             lambda ctx: f"/view_shelter/{ctx['shelter']}/dog/pages?after={ctx['middle_animal']}", False),
+    Scenario('shelter_flipbook_pages', 'shelter', 'get', lambda ctx: '/shelter_dashboard/pages', False),
+    # Notifications
+    Scenario('notifications', 'user', 'get', lambda ctx: '/notifications', False),
+    Scenario('notifications_deep_page', 'user', 'get',
+             lambda ctx: f"/notifications?before={ctx['deep_cursor']}", False),
+    Scenario('shelter_notifications', 'shelter', 'get', lambda ctx: '/notifications', False),
+    # Writes and cascades
+    Scenario('approve_adoption', 'shelter', 'post',
+             lambda ctx: (f'/shelter/approve_adoption/{pending_request(ctx)}', {}), True),
+    Scenario('reject_adoption', 'shelter', 'post',
+             lambda ctx: (f'/shelter/reject_adoption/{pending_request(ctx)}', {}), True),
+    Scenario('delete_animal', 'shelter', 'get', lambda ctx: f'/delete_animal/{available_animal(ctx)}', True),
+    Scenario('approve_shelter', 'admin', 'post',
+             lambda ctx: (f'/admin/approve_shelter/{pending_shelter(ctx)}', {}), True),
+    Scenario('delete_shelter', 'admin', 'post',
+             lambda ctx: (f'/admin/delete_shelter/{shelter_to_delete(ctx)}', {}), True),
+]
+
+
+# The busiest accounts, so the pages are as big as the dataset allows
+def benchmark_context():
+    admin = db.session.query(User.id).filter_by(role='admin').scalar()
+    user = db.session.query(Notification.user_id).join(User, User.id == Notification.user_id)\
+                     .filter(User.role == 'user').group_by(Notification.user_id)\
+                     .order_by(db.func.count().desc(), Notification.user_id).limit(1).scalar()
+    shelter = db.session.query(Animal.shelter_id).join(Shelter).filter(Shelter.approved.is_(True))\
+                        .group_by(Animal.shelter_id)\
+                        .order_by(db.func.count().desc(), Animal.shelter_id).limit(1).scalar()
+    if None in (admin, user, shelter):
+        sys.exit("The database needs an admin, a user with notifications and a shelter with animals")
+
+    dogs = db.session.query(db.func.count(Animal.id)).filter(
+        Animal.shelter_id == shelter, db.func.lower(Animal.type) == 'dog').scalar()
+    middle_animal = db.session.query(Animal.id).filter(
+        Animal.shelter_id == shelter, db.func.lower(Animal.type) == 'dog'
+    ).order_by(Animal.id).offset(dogs // 2).limit(1).scalar() or 0
+
+    # Halfway down the user's feed, at most 50 pages deep
+    feed_size = db.session.query(db.func.count(Notification.id)).filter(Notification.user_id == user).scalar()
+    depth = min(feed_size // 2, 50 * NOTIFICATIONS_PER_PAGE)
+    deep_note = feed_query('user', user).offset(depth).first()
+
+    return {'admin': admin, 'user': user, 'shelter': shelter, 'middle_animal': middle_animal,
+            'deep_cursor': encode_cursor(deep_note), 'user_notifications': feed_size}
+
+
+# ---------------------- Timing ----------------------
+# instrumentation.py's header: app;dur=12.3, db;dur=4.5;desc="7 queries", tpl;dur=3.2
+SERVER_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries", tpl;dur=([\d.]+)')
+
+
+def clear_caches(app):
+    app.extensions['page_cache'].clear()
+    version_cache.clear()
+    unread_cache.clear()
+    admin_cache.clear()
+
+
+def request_once(app, client, scenario, ctx, cold):
+    with app.app_context():
+        target = scenario.target(ctx)
+    url, data = target if isinstance(target, tuple) else (target, None)
+
+    # A fresh session every time, kaya hindi naiipon ang flashed messages
+    with client.session_transaction() as session:
+        session.clear()
+        session['role'] = scenario.role
+        session['user_id'] = ctx[scenario.role]
+    if cold:
+        clear_caches(app)
+
+    started = time.perf_counter()
+    response = client.open(url, method=scenario.method.upper(), data=data)
+    elapsed = time.perf_counter() - started
+    match = SERVER_TIMING.search(response.headers.get('Server-Timing', ''))
+    sql_ms, queries, template_ms = (float(match[1]), int(match[2]), float(match[3])) if match else (0, 0, 0)
+    return elapsed, response.status_code, queries, sql_ms, template_ms
+
+
+# Nearest-rank percentile of sorted values
+def percentile(values, q):
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def summarize(samples, errors, statuses):
+    latencies = sorted(sample[0] * 1000 for sample in samples)
+    total = sum(latencies) / 1000
+    summary = {
+        'iterations': len(samples), 'errors': errors, 'statuses': statuses,
+        'total_s': round(total, 4),
+        'throughput_rps': round(len(samples) / total, 2) if total else None,
+    }
+    if latencies:
+        summary['latency_ms'] = dict(
+            {'min': round(latencies[0], 3), 'mean': round(sum(latencies) / len(latencies), 3)},
+            **{f'p{q}': round(percentile(latencies, q), 3) for q in PERCENTILES},
+            max=round(latencies[-1], 3))
+        summary['queries'] = round(sum(sample[2] for sample in samples) / len(samples), 2)
+        summary['sql_ms'] = round(sum(sample[3] for sample in samples) / len(samples), 3)
+        summary['template_ms'] = round(sum(sample[4] for sample in samples) / len(samples), 3)
+    return summary
+
+
+def run_scenario(app, client, scenario, ctx, args):
+    iterations = args.write_iterations if scenario.write else args.iterations
+    warmup = 0 if scenario.write else args.warmup
+    samples, errors, statuses = [], 0, {}
+    for i in range(warmup + iterations):
+        try:
+            elapsed, status, queries, sql_ms, template_ms = request_once(app, client, scenario, ctx, args.cold)
+        except Exhausted:
+            break
+        if i < warmup:
+            continue
+        samples.append((elapsed, status, queries, sql_ms, template_ms))
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+        if status >= 400:
+            errors += 1
+    return summarize(samples, errors, statuses)
+
+
+# ---------------------- Run Metadata ----------------------
+def git(*command):
+    try:
+        return subprocess.run(['git', *command], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def dataset_counts():
+    return {model.__tablename__: db.session.query(db.func.count(model.id)).scalar()
+            for model in (User, Shelter, Animal, AdoptionRequest, Notification)}
+
+
+# ---------------------- Setup ----------------------
+# Throwaway database and image folder; returns the DATABASE_URL to use
+def prepare_database(args, folder):
+    path = os.path.join(folder, 'benchmark.db')
+    if args.database:
+        if not os.path.exists(args.database):
+            sys.exit(f"No such SQLite database: {args.database}")
+        # The backup API also copies what is still in a WAL file
+        source, target = sqlite3.connect(args.database), sqlite3.connect(path)
+        source.backup(target)
+        source.close()
+        target.close()
+    return 'sqlite:///' + path
+
+
+def run(args):
+    folder = tempfile.mkdtemp(prefix='pawssion-benchmark-')
+    try:
+        os.environ['DATABASE_URL'] = prepare_database(args, folder)
+        os.environ['INSTRUMENTATION_ENABLED'] = '1'  # per-request SQL counts (Server-Timing)
+        os.environ.setdefault('SLOW_REQUEST_MS', str(10 ** 9))
+        images = os.path.join(folder, 'images')
+        shutil.copytree(os.path.join(ROOT, 'static', 'images'), images)
+
+        # app.py reads its configuration (DATABASE_URL...) when imported
+        from app import app
+        from migrations import upgrade_database
+        app.config.update(WTF_CSRF_ENABLED=False, JOBS_INLINE=True, UPLOAD_FOLDER=images)
+
+        sizes = datagen.size_options(args)
+        with app.app_context():
+            db.create_all()
+            upgrade_database()
+            if not args.database:
+                print(f"Generating the '{args.scale}' dataset (seed {args.seed})...")
+                datagen.generate(seed=args.seed, log=lambda line: print('  ' + line), **sizes)
+            ctx = benchmark_context()
+            dataset = dataset_counts()
+            dialect = db.engine.dialect.name
+
+        client = app.test_client()
+        selected = [s for s in SCENARIOS if not args.only or s.name in args.only]
+        routes = {}
+        for scenario in selected:
+            routes[scenario.name] = run_scenario(app, client, scenario, ctx, args)
+            print_route(scenario.name, routes[scenario.name])
+
+        return {
+            'format': 1,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'git': {'commit': git('rev-parse', 'HEAD'), 'branch': git('rev-parse', '--abbrev-ref', 'HEAD'),
+                    'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))},
+            'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                            'database': dialect, 'config': os.environ.get('PAWSSION_CONFIG', 'development')},
+            'dataset': {'source': args.database or 'datagen',
+                        'sizes': None if args.database else dict(sizes, seed=args.seed), 'rows': dataset},
+            'settings': {'iterations': args.iterations, 'write_iterations': args.write_iterations,
+                         'warmup': args.warmup, 'cold_caches': args.cold},
+            'principals': ctx,
+            'routes': routes,
+        }
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+# ---------------------- Output ----------------------
+def print_route(name, result):
+    latency = result.get('latency_ms')
+    if not latency:
+        print(f"{name:<28} skipped (no rows left to use)")
+        return
+    errors = f"  {result['errors']} errors" if result['errors'] else ''
+    print(f"{name:<28} n={result['iterations']:<5} p50 {latency['p50']:8.2f} ms  p95 {latency['p95']:8.2f} ms  "
+          f"{result['throughput_rps']:8.1f} req/s  {result['queries']:5.1f} queries{errors}")
+
+
+def change(old, new):
+    if old is None or new is None:
+        return '      -'
+    if not old:
+        return '      ='
+    return f'{(new - old) / old * 100:+6.1f}%'
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"old: {old['git']['commit']} ({old['created_at']})")
+    print(f"new: {new['git']['commit']} ({new['created_at']})")
+    if old['dataset']['rows'] != new['dataset']['rows']:
+        print("warning: the runs used different datasets")
+    print(f"{'route':<28} {'p50 ms':>18} {'':>7} {'p95 ms':>18} {'':>7} {'queries':>13}")
+    for name in new['routes']:
+        a, b = old['routes'].get(name, {}), new['routes'][name]
+        a_lat, b_lat = a.get('latency_ms', {}), b.get('latency_ms', {})
+        print(f"{name:<28} "
+              f"{a_lat.get('p50', 0):8.2f} -> {b_lat.get('p50', 0):6.2f} {change(a_lat.get('p50'), b_lat.get('p50'))} "
+              f"{a_lat.get('p95', 0):8.2f} -> {b_lat.get('p95', 0):6.2f} {change(a_lat.get('p95'), b_lat.get('p95'))} "
+              f"{a.get('queries', 0):5.1f} -> {b.get('queries', 0):5.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    datagen.add_size_arguments(parser)
+    parser.add_argument('--database', help="SQLite file to copy instead of generating a dataset")
+    parser.add_argument('--iterations', type=int, default=50, help="timed requests per read route")
+    parser.add_argument('--write-iterations', type=int, default=10, help="timed requests per write route")
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--cold', action='store_true', help="clear the in-process caches before every request")
+    parser.add_argument('--only', nargs='+', metavar='ROUTE', choices=[s.name for s in SCENARIOS])
+    parser.add_argument('--output', help="JSON file (default: benchmarks/<time>-<commit>.json)")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run(args)
+    output = args.output or os.path.join(
+        'benchmarks', f"{datetime.now():%Y%m%d-%H%M%S}-{(results['git']['commit'] or 'nogit')[:8]}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
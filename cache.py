@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import OrderedDict
+
+# ---------------------- In-process Cache ----------------------
+# Small LRU cache with per-entry TTL, safe to share between request threads.
+# Anything with the same get/set/delete/incr/clear methods (e.g. a wrapper
+# around Redis) can be used in its place as a shared backend.
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def _get_entry(self, key):
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._get_entry(key)
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    # Adds delta to a cached number; does nothing if the key is not cached
+    # (the next read recomputes it). Returns the new value or None.
+    def incr(self, key, delta=1):
+        with self._lock:
+            value = self._get_entry(key)
+            if value is _MISSING:
+                return None
+            expires_at, _ = self._data[key]
+            value += delta
+            self._data[key] = (expires_at, value)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,83 @@
+from models import db, Shelter, Animal, AdoptionRequest, Notification
+from notification_service import notify_admin, notify_from_select, forget_unread_count
+from jobs import job_handler
+from images import release_images
+from catalog import forget_catalog_shelter, forget_catalog_animals
+from page_cache import invalidate_shelter
+
+# ---------------------- Cascading Deletes ----------------------
+# Set-based: a fixed number of statements no matter how many animals or
+# adoption requests are affected (walang per-row load/delete). Safe to run
+# more than once: if the shelter/animal is already gone, wala nang gagawin.
+
+
+# Shelter + its animals, adoption requests, notifications and image files
+@job_handler('delete_shelter')
+def delete_shelter_cascade(shelter_id):
+    shelter = db.session.get(Shelter, shelter_id)
+    if shelter is None:
+        return
+    shelter_name = shelter.name
+    animal_ids = db.select(Animal.id).where(Animal.shelter_id == shelter_id)
+
+    # Notify users whose adoption requests will be deleted (INSERT ... SELECT)
+    notify_from_select(
+        db.select(
+            AdoptionRequest.user_id.label('user_id'),
+            db.cast(db.null(), db.Integer).label('shelter_id'),  # typed NULL for PostgreSQL
+            (db.literal("Your adoption request for ")
+             + db.func.coalesce(Animal.name, Animal.type)
+             + db.literal(f" has been canceled because the shelter '{shelter_name}' was deleted.")).label('message')
+        ).join(Animal, Animal.id == AdoptionRequest.animal_id)
+         .where(Animal.shelter_id == shelter_id)
+    )
+
+    # Delete all adoption requests for animals of this shelter
+    db.session.execute(db.delete(AdoptionRequest).where(AdoptionRequest.animal_id.in_(animal_ids)))
+
+    # Shelter notifications: detach the ones users also see, delete the rest
+    db.session.execute(
+        db.update(Notification)
+          .where(Notification.shelter_id == shelter_id, Notification.user_id.is_not(None))
+          .values(shelter_id=None)
+    )
+    db.session.execute(
+        db.delete(Notification)
+          .where(Notification.shelter_id == shelter_id, Notification.user_id.is_(None))
+    )
+    forget_unread_count('shelter', shelter_id)
+
+    # Delete the animals, then their image files once nothing else uses them
+    images = db.session.scalars(db.select(Animal.image1).where(Animal.shelter_id == shelter_id)).all()
+    forget_catalog_shelter(shelter_id)
+    db.session.execute(db.delete(Animal).where(Animal.shelter_id == shelter_id))
+    release_images(images)
+
+    # Notify admin about the deletion
+    notify_admin(f"The shelter '{shelter_name}' and all its animals were successfully deleted.")
+
+    invalidate_shelter(shelter_id, listing=True)
+
+    # Finally, delete the shelter
+    db.session.expunge(shelter)
+    db.session.execute(db.delete(Shelter).where(Shelter.id == shelter_id))
+
+
+# Animal + its adoption requests; pending requesters are notified
+def delete_animal_cascade(animal):
+    animal_id = animal.id
+    image = animal.image1
+
+    notify_from_select(
+        db.select(
+            AdoptionRequest.user_id.label('user_id'),
+            db.literal(animal.shelter_id).label('shelter_id'),
+            db.literal(f"Your adoption request for '{animal.name}' was cancelled because the animal was removed by the shelter.").label('message')
+        ).where(AdoptionRequest.animal_id == animal_id, AdoptionRequest.status == 'pending')
+    )
+
+    db.session.execute(db.delete(AdoptionRequest).where(AdoptionRequest.animal_id == animal_id))
+    db.session.expunge(animal)
+    forget_catalog_animals([animal_id])
+    db.session.execute(db.delete(Animal).where(Animal.id == animal_id))
+    release_images([image])
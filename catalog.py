@@ -0,0 +1,116 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, Shelter, Animal, CatalogEntry
+from adoption_status import AVAILABLE
+
+# ---------------------- Adoption Catalog ----------------------
+# catalog_entry is a precomputed list of every adoptable animal (Available,
+# in an approved shelter) with the shelter name, kaya isang index range scan
+# lang ang /browse. It is kept current incrementally: ORM changes to Animal
+# and Shelter rows are collected on the session while flushing, and just
+# before commit the affected entries are deleted and re-selected with one
+# INSERT ... SELECT (set-based, walang per-row loop). Bulk deletes that
+# bypass the ORM (cascades.py) call forget_catalog_* themselves.
+
+CATALOG_PER_PAGE = 24
+
+
+def catalog_select():
+    return db.select(
+        Animal.id, Animal.shelter_id, Shelter.name, Animal.name, db.func.lower(Animal.type),
+        Animal.breed, Animal.gender, Animal.age, Animal.image1
+    ).join(Shelter, Shelter.id == Animal.shelter_id)\
+     .where(Animal.status == AVAILABLE, Shelter.approved.is_(True))
+
+
+CATALOG_COLUMNS = ['animal_id', 'shelter_id', 'shelter_name', 'name', 'type',
+                   'breed', 'gender', 'age', 'image1']
+
+
+def refresh_catalog(animal_ids=(), shelter_ids=()):
+    conditions = []
+    if animal_ids:
+        conditions.append((CatalogEntry.animal_id.in_(animal_ids), Animal.id.in_(animal_ids)))
+    if shelter_ids:
+        conditions.append((CatalogEntry.shelter_id.in_(shelter_ids), Animal.shelter_id.in_(shelter_ids)))
+    for entry_filter, animal_filter in conditions:
+        db.session.execute(db.delete(CatalogEntry).where(entry_filter))
+        db.session.execute(db.insert(CatalogEntry).from_select(
+            CATALOG_COLUMNS, catalog_select().where(animal_filter)
+        ))
+
+
+# Full rebuild (migration backfill / repairs)
+def rebuild_catalog():
+    db.session.execute(db.delete(CatalogEntry))
+    db.session.execute(db.insert(CatalogEntry).from_select(CATALOG_COLUMNS, catalog_select()))
+    db.session.commit()
+
+
+def forget_catalog_animals(animal_ids):
+    db.session.execute(db.delete(CatalogEntry).where(CatalogEntry.animal_id.in_(animal_ids)))
+
+
+def forget_catalog_shelter(shelter_id):
+    db.session.execute(db.delete(CatalogEntry).where(CatalogEntry.shelter_id == shelter_id))
+
+
+# Newest first; returns (entries, next_cursor)
+def catalog_page(animal_type=None, after=None, limit=CATALOG_PER_PAGE):
+    query = CatalogEntry.query
+    if animal_type:
+        query = query.filter(CatalogEntry.type == animal_type.lower())
+    if after is not None:
+        query = query.filter(CatalogEntry.animal_id < after)
+    entries = query.order_by(CatalogEntry.animal_id.desc()).limit(limit + 1).all()
+    if len(entries) > limit:
+        entries = entries[:limit]
+        return entries, entries[-1].animal_id
+    return entries, None
+
+
+# ---------------------- Change Tracking ----------------------
+CATALOG_FIELDS = {
+    Animal: ('name', 'type', 'breed', 'gender', 'age', 'image1', 'status', 'shelter_id'),
+    Shelter: ('name', 'approved'),
+}
+
+
+def pending_catalog(session):
+    return session.info.setdefault('pending_catalog', {'animals': set(), 'shelters': set()})
+
+
+def _changed(obj, fields):
+    state = db.inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_catalog_changes(session, flush_context, instances):
+    pending = None
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Animal):
+            if obj in session.dirty and not _changed(obj, CATALOG_FIELDS[Animal]):
+                continue
+            pending = pending or pending_catalog(session)
+            pending['animals'].add(obj)
+        elif isinstance(obj, Shelter) and obj in session.dirty and _changed(obj, CATALOG_FIELDS[Shelter]):
+            pending = pending or pending_catalog(session)
+            pending['shelters'].add(obj.id)
+
+
+@event.listens_for(Session, 'before_commit')
+def _update_catalog(session):
+    # Changes not flushed yet reach _collect_catalog_changes only here (commit
+    # itself flushes after this hook), and new animals need their ids
+    session.flush()
+    pending = session.info.pop('pending_catalog', None)
+    if pending is None:
+        return
+    animal_ids = {db.inspect(a).identity[0] for a in pending['animals'] if db.inspect(a).identity}
+    refresh_catalog(animal_ids, pending['shelters'])
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_catalog_changes(session):
+    session.info.pop('pending_catalog', None)
@@ -1,7 +1,7 @@
 -- Version 1: Initial Database Schema
 
--- Users 
-CREATE TABLE user (
+-- Users ("user" is a reserved word in PostgreSQL, kaya naka-quote)
+CREATE TABLE "user" (
     id SERIAL PRIMARY KEY,
     first_name VARCHAR(100) NOT NULL DEFAULT 'Not set',
     last_name VARCHAR(100) NOT NULL DEFAULT 'Not set',
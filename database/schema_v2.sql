@@ -0,0 +1,20 @@
+-- Version 2: Indexes for the hot filter columns
+-- (Animal.status / Animal.adopter_id are added by migrations.upgrade_animal_status
+--  since SQLite has no ADD COLUMN IF NOT EXISTS)
+
+-- Shelters: approved shelter lists
+CREATE INDEX IF NOT EXISTS ix_shelter_approved ON shelter (approved);
+
+-- Animals: listings per shelter and type (case-insensitive), availability filter
+CREATE INDEX IF NOT EXISTS ix_animal_shelter_type ON animal (shelter_id, lower(type));
+CREATE INDEX IF NOT EXISTS ix_animal_status ON animal (status);
+
+-- Adoption Requests: approved/pending lookups per animal, requests per user
+CREATE INDEX IF NOT EXISTS ix_adoption_request_animal_status ON adoption_request (animal_id, status);
+CREATE INDEX IF NOT EXISTS ix_adoption_request_user_animal ON adoption_request (user_id, animal_id);
+
+-- Notifications: unread counts and newest-first feeds per user / shelter
+CREATE INDEX IF NOT EXISTS ix_notification_user_read ON notification (user_id, read);
+CREATE INDEX IF NOT EXISTS ix_notification_user_timestamp ON notification (user_id, timestamp DESC);
+CREATE INDEX IF NOT EXISTS ix_notification_shelter_read ON notification (shelter_id, read);
+CREATE INDEX IF NOT EXISTS ix_notification_shelter_timestamp ON notification (shelter_id, timestamp DESC);
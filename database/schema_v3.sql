@@ -0,0 +1,9 @@
+-- Version 3: Keyset-paginated notification feeds
+-- The feed pages on (timestamp, id), so the id tiebreaker is part of the index
+-- and no sort step is needed per page.
+
+DROP INDEX IF EXISTS ix_notification_user_timestamp;
+DROP INDEX IF EXISTS ix_notification_shelter_timestamp;
+
+CREATE INDEX IF NOT EXISTS ix_notification_user_feed ON notification (user_id, timestamp DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_notification_shelter_feed ON notification (shelter_id, timestamp DESC, id DESC);
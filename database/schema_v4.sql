@@ -0,0 +1,9 @@
+-- Version 4: Server-side animal search (animal_search.py)
+-- Listings filter on shelter + type + availability, and on age ranges.
+-- The (shelter_id, lower(type), status) index also covers the old
+-- (shelter_id, lower(type)) lookups.
+
+DROP INDEX IF EXISTS ix_animal_shelter_type;
+
+CREATE INDEX IF NOT EXISTS ix_animal_shelter_type_status ON animal (shelter_id, lower(type), status);
+CREATE INDEX IF NOT EXISTS ix_animal_shelter_age ON animal (shelter_id, CAST(NULLIF(age, '') AS INTEGER));
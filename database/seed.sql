@@ -1,6 +1,6 @@
 INSERT INTO user (id, first_name, last_name, username, email, contact, address, age, gender, role, password) 
 VALUES
-    (1,'Not set', 'Not set', 'admin', 'admin@pawssion.com', 'Not set', 'Not set' NULL, 'admin', 'scrypt:32768:8:1$IyMmF8xvlAMjT1qt$d367e549baace99468059c3704d75219bf02189334137f75bfa12cfdf8c33413d1ac9d89898e8eb4ef481d388a2e7dc6d11b8696ca17d62ab902afe5144c1252'
+    (1,'Not set', 'Not set', 'admin', 'admin@pawssion.com', 'Not set', 'Not set', NULL, 'Not set', 'admin', 'scrypt:32768:8:1$IyMmF8xvlAMjT1qt$d367e549baace99468059c3704d75219bf02189334137f75bfa12cfdf8c33413d1ac9d89898e8eb4ef481d388a2e7dc6d11b8696ca17d62ab902afe5144c1252'),
     (2, 'Maria', 'Santos', 'marias', 'maria.santos@gmail.com', '09123456789', '123 Mabini St, Quezon City', 28, 'Female', 'user', 'scrypt:32768:8:1$4uw8RXYIkjnGgZ6a$f3c432234ef739aeb36c5fcb0149bfcd7dd4e416d62e975dc8ad3f0709bf1132e2df31815cfeca31ba82328a1c6e56a3285b1743bdac44434f00d2e7dc96cd75'),
     (3, 'Juan', 'Dela Cruz', 'juandelacruz', 'juan.cruz@gmail.com', '09987654321', '45 Aguinaldo Ave, Manila', 32, 'Male', 'user', 'scrypt:32768:8:1$cD62eW6JCRsfQGPg$e30ee467b122781c195052f068f1ba8160dcf70eb6558a61382eabf1f7892407c3f8b855e0391a6cdcac503a2c5d7f6d9c4d2dae86927d876129aa6a993c81ff'),
     (4, 'Angel', 'Reyes', 'angelr', 'angel.reyes@gmail.com', '09112223344', '7 P. Burgos St, Makati', 24, 'Female', 'user', 'scrypt:32768:8:1$Ok4CnmoAESjonc14$34f8e6fe0314834ee2405352a6f356d1bc82ba8d210ec1847fd9167d77e03ebd90ad33b3f4e0c371c4ef824b37ce9a7d44c0d38e70024909bac082115913887a'),
@@ -0,0 +1,316 @@
+"""Fill a database with synthetic users, shelters, animals, adoption requests and notifications.
+
+    python datagen.py --scale large
+    python datagen.py --database-url sqlite:////tmp/big.db --users 20000 \
+        --shelters 300 --animals-per-shelter 80 --notifications 5000000
+
+Rows are written with bulk INSERTs, --batch-size rows per statement and
+commit, so millions of notifications never sit in memory at once. Rows are
+added after whatever the database already holds (ids continue from the
+current maximum); --reset empties the tables first. The same --seed and
+sizes give the same rows (timestamps are relative to when it runs).
+
+Every generated account has the password from --password (hashed once).
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+from flask import current_app
+from werkzeug.security import generate_password_hash
+from models import db, User, Shelter, Animal, AdoptionRequest, Notification
+from catalog import rebuild_catalog
+
+# ---------------------- Sizes ----------------------
+# --scale presets; the size options override single numbers
+SCALES = {
+    'small': dict(users=200, shelters=10, animals_per_shelter=20, requests_per_animal=2,
+                  notifications=10_000),
+    'medium': dict(users=2_000, shelters=50, animals_per_shelter=40, requests_per_animal=3,
+                   notifications=200_000),
+    'large': dict(users=20_000, shelters=200, animals_per_shelter=60, requests_per_animal=4,
+                  notifications=2_000_000),
+}
+
+PENDING_SHELTERS = 0.05    # share of shelters still waiting for approval
+ADOPTED_ANIMALS = 0.2      # share of animals that already have an approved request
+USER_NOTIFICATIONS = 0.75  # the rest go to shelters
+HISTORY_DAYS = 365
+# Recipients and requesters are picked as ids[len * random() ** SKEW]: the
+# first accounts get most of the activity, like real power users
+SKEW = 3
+
+# ---------------------- Vocabulary ----------------------
+FIRST_NAMES = ['Maria', 'Juan', 'Angel', 'Mark', 'Jenny', 'Paolo', 'Catherine', 'Brian', 'Ashley', 'Kevin',
+               'Beatriz', 'Francis', 'Liza', 'Carlo', 'Denise', 'Joshua', 'Rhea', 'Martin', 'Sophia', 'Adrian',
+               'Andrea', 'Miguel', 'Patricia', 'Rafael', 'Kristine', 'Jerome', 'Nicole', 'Gabriel']
+LAST_NAMES = ['Santos', 'Dela Cruz', 'Reyes', 'Villanueva', 'Torres', 'Garcia', 'Lim', 'Lopez', 'Flores',
+              'Ramos', 'Gutierrez', 'Cruz', 'Mendoza', 'Navarro', 'Uy', 'Tan', 'Castillo', 'Dizon',
+              'Aquino', 'Bautista', 'Ocampo', 'Pascual', 'Salazar', 'Domingo']
+STREETS = ['Mabini St', 'Rizal Ave', 'Aguinaldo Ave', 'P. Burgos St', 'Taft Ave', 'España Blvd',
+           'Quezon Ave', 'Roxas Blvd', 'Bonifacio St', 'Del Pilar St', 'Padre Faura St', 'Katipunan Ave']
+CITIES = ['Quezon City', 'Manila', 'Makati', 'Pasig', 'Pasay', 'Taguig', 'Antipolo City', 'Cebu City',
+          'Davao City', 'Iloilo City', 'Baguio City']
+SHELTER_WORDS = ['Paw', 'Tails', 'Haven', 'Whiskers', 'Hope', 'Furever', 'Gentle', 'Safe', 'Happy',
+                 'Little', 'Rescue', 'Bark']
+SHELTER_KINDS = ['Shelter', 'Rescue Center', 'Foundation', 'Sanctuary', 'Rescue Home', 'Animal Care']
+SHELTER_TYPES = ['Non-Profit', 'Private', 'Government']
+PET_NAMES = ['Luna', 'Max', 'Bella', 'Rocky', 'Coco', 'Milo', 'Cleo', 'Bruno', 'Mimi', 'Shadow', 'Snow',
+             'Pepper', 'Ginger', 'Lily', 'Buddy', 'Bolt', 'Sparky', 'Rex', 'Atlas', 'Whisker', 'Choco',
+             'Brownie', 'Mochi', 'Tofu', 'Kisses', 'Bantay']
+BREEDS = {
+    'Dog': ['Aspin', 'Labrador', 'Shih Tzu', 'Golden Retriever', 'Beagle', 'Pomeranian', 'Chihuahua',
+            'Siberian Husky', 'Dachshund', 'Poodle'],
+    'Cat': ['Puspin', 'Persian', 'Siamese', 'Abyssinian', 'Maine Coon', 'British Shorthair', 'Bengal',
+            'Ragdoll'],
+}
+TRAITS = ['Friendly and playful', 'Quiet but affectionate', 'Loves belly rubs', 'Good with kids',
+          'Shy at first, very sweet', 'Energetic and loves walks', 'House-trained', 'Loves to cuddle',
+          'Rescued from the streets', 'Gets along with other pets']
+# Images that ship in static/images
+IMAGES = [f'{name.lower()}.png' for name in PET_NAMES[:20]]
+REASONS = ['I have a big yard and lots of time to play.', 'Our family has been looking for a companion.',
+           'I work from home and can care for a pet full-time.', 'My old dog passed away and I miss having one.',
+           'I want to give a rescued animal a loving home.']
+
+
+# ---------------------- Writing ----------------------
+def next_id(model):
+    return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+
+# Bulk INSERTs of batch_size rows from an iterable of dicts; returns the row count
+def write(model, rows, batch_size):
+    rows = iter(rows)
+    written = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return written
+        db.session.execute(model.__table__.insert(), batch)  # Core executemany, no ORM bookkeeping
+        db.session.commit()
+        written += len(batch)
+
+
+def skewed(rng, ids):
+    return ids[int(len(ids) * rng.random() ** SKEW)]
+
+
+def past(rng, now, days=HISTORY_DAYS):
+    return now - timedelta(seconds=int(days * 86400 * rng.random()))
+
+
+# Explicit ids leave PostgreSQL's SERIAL sequences behind; move them past the data
+def reset_sequences(models):
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for model in models:
+        table = model.__tablename__
+        db.session.execute(db.text(
+            f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+            f"COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM \"{table}\""
+        ))
+    db.session.commit()
+
+
+def clear_tables():
+    for table in reversed(db.metadata.sorted_tables):
+        db.session.execute(table.delete())
+    db.session.commit()
+
+
+# ---------------------- Rows ----------------------
+def user_rows(rng, start, count, password_hash):
+    for user_id in range(start, start + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        username = f"{first}{last}".replace(' ', '').lower() + str(user_id)
+        yield {'id': user_id, 'first_name': first, 'last_name': last, 'username': username,
+               'email': f'{username}@example.com', 'contact': f'09{rng.randrange(10 ** 9):09d}',
+               'address': f'{rng.randint(1, 300)} {rng.choice(STREETS)}, {rng.choice(CITIES)}',
+               'age': rng.randint(18, 70), 'gender': rng.choice(['Female', 'Male']), 'role': 'user',
+               'password': password_hash}
+
+
+# The last PENDING_SHELTERS of them (at least one) still wait for approval
+def shelter_rows(rng, start, count, password_hash):
+    first_pending = start + count - max(1, round(count * PENDING_SHELTERS))
+    for shelter_id in range(start, start + count):
+        name = f"{rng.choice(SHELTER_WORDS)} {rng.choice(SHELTER_WORDS)} {rng.choice(SHELTER_KINDS)} {shelter_id}"
+        slug = name.replace(' ', '').lower()
+        yield {'id': shelter_id, 'name': name,
+               'description': f"Community rescue caring for abandoned dogs and cats in {rng.choice(CITIES)}.",
+               'address': f'{rng.randint(1, 300)} {rng.choice(STREETS)}, {rng.choice(CITIES)}',
+               'contact_number': f'09{rng.randrange(10 ** 9):09d}', 'email': f'{slug}@example.org',
+               'website': f'https://{slug}.org' if rng.random() < 0.6 else None,
+               'date_established': f'{rng.randint(1, 12):02d}/{rng.randint(1990, 2024)}',
+               'shelter_type': rng.choice(SHELTER_TYPES),
+               'approved': None if shelter_id >= first_pending else True,
+               'role': 'shelter', 'password': password_hash}
+
+
+# Approved shelters get between half and one and a half times the average
+def animal_rows(rng, start, shelter_ids, per_shelter, user_ids):
+    animal_id = start
+    for shelter_id in shelter_ids:
+        for _ in range(rng.randint(per_shelter // 2, per_shelter * 3 // 2)):
+            kind = 'Dog' if rng.random() < 0.55 else 'Cat'
+            adopted = rng.random() < ADOPTED_ANIMALS
+            yield {'id': animal_id, 'name': rng.choice(PET_NAMES), 'age': str(rng.randint(0, 14)),
+                   'breed': rng.choice(BREEDS[kind]), 'gender': rng.choice(['Female', 'Male']), 'type': kind,
+                   'description': rng.choice(TRAITS), 'image1': rng.choice(IMAGES), 'shelter_id': shelter_id,
+                   'status': 'Adopted' if adopted else 'Available',
+                   'adopter_id': skewed(rng, user_ids) if adopted else None}
+            animal_id += 1
+
+
+# Adopted animals: the adopter's request is approved and the others were
+# canceled by the approval. Available animals: mostly pending, some rejected.
+def request_rows(rng, start, animals, per_animal, user_ids, now):
+    request_id = start
+    for animal_id, adopter_id in animals:
+        requesters = {skewed(rng, user_ids) for _ in range(rng.randint(0, per_animal * 2))}
+        if adopter_id is not None:
+            requesters.add(adopter_id)
+        for user_id in sorted(requesters):
+            if adopter_id is not None:
+                status = 'approved' if user_id == adopter_id else 'canceled'
+            else:
+                status = 'rejected' if rng.random() < 0.15 else 'pending'
+            yield {'id': request_id, 'reason': rng.choice(REASONS), 'status': status,
+                   'timestamp': past(rng, now, 90), 'user_id': user_id, 'animal_id': animal_id}
+            request_id += 1
+
+
+USER_MESSAGES = [
+    "Your adoption request for {pet} has been submitted and is now pending approval.",
+    "Your adoption request for {pet} has been approved!",
+    "Your adoption request for {pet} has been rejected.",
+    "Your adoption request for '{pet}' was cancelled because the animal was removed by the shelter.",
+]
+SHELTER_MESSAGES = [
+    "{name} requested to adopt {pet}",
+    "{name} cancelled the adoption request for {pet}",
+]
+
+
+# Older notifications are mostly read; the last few days mostly unread
+def notification_rows(rng, start, count, user_ids, shelter_ids, now):
+    for note_id in range(start, start + count):
+        timestamp = now - timedelta(seconds=int(HISTORY_DAYS * 86400 * rng.random() ** 2))
+        recent = now - timestamp < timedelta(days=3)
+        row = {'id': note_id, 'timestamp': timestamp, 'read': rng.random() < (0.4 if recent else 0.95),
+               'user_id': None, 'shelter_id': None}
+        pet = rng.choice(PET_NAMES)
+        if not shelter_ids or (user_ids and rng.random() < USER_NOTIFICATIONS):
+            row['user_id'] = skewed(rng, user_ids)
+            row['message'] = rng.choice(USER_MESSAGES).format(pet=pet)
+        else:
+            row['shelter_id'] = skewed(rng, shelter_ids)
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            row['message'] = rng.choice(SHELTER_MESSAGES).format(name=name, pet=pet)
+        yield row
+
+
+# One "new shelter" notice per generated shelter, for the admin
+def admin_rows(rng, start, admin_id, shelters, now):
+    for note_id, (name, approved) in enumerate(shelters, start):
+        yield {'id': note_id, 'message': f"New shelter registered: {name}. Pending approval.",
+               'timestamp': past(rng, now), 'read': bool(approved), 'user_id': admin_id, 'shelter_id': None}
+
+
+# ---------------------- Generate ----------------------
+# Needs an app context. Returns {table: rows written}.
+def generate(users, shelters, animals_per_shelter, requests_per_animal, notifications,
+             seed=1, password='password123', batch_size=10_000, log=print):
+    rng = random.Random(seed)
+    now = datetime.now().replace(microsecond=0)
+    password_hash = generate_password_hash(password, current_app.config['PASSWORD_HASH_METHOD'])
+    written = {}
+
+    def step(model, rows):
+        started = time.perf_counter()
+        written[model.__tablename__] = write(model, rows, batch_size)
+        log(f"{model.__tablename__:<20} {written[model.__tablename__]:>10} rows  "
+            f"{time.perf_counter() - started:7.2f}s")
+
+    # Admin account (notifications about new shelters go to it)
+    admin_id = db.session.query(User.id).filter_by(role='admin').scalar()
+    if admin_id is None:
+        admin_id = next_id(User)
+        write(User, [{'id': admin_id, 'username': 'admin', 'email': 'admin@pawssion.com',
+                      'password': password_hash, 'role': 'admin'}], batch_size)
+
+    start = next_id(User)
+    step(User, user_rows(rng, start, users, password_hash))
+    user_ids = list(range(start, start + users))
+
+    shelter_start = next_id(Shelter)
+    step(Shelter, shelter_rows(rng, shelter_start, shelters, password_hash))
+    shelter_ids = [shelter_id for (shelter_id,) in db.session.query(Shelter.id).filter(
+        Shelter.id >= shelter_start, Shelter.approved.is_(True)).order_by(Shelter.id)]
+
+    start = next_id(Animal)
+    step(Animal, animal_rows(rng, start, shelter_ids, animals_per_shelter, user_ids) if user_ids else [])
+    animals = db.session.query(Animal.id, Animal.adopter_id).filter(Animal.id >= start).order_by(Animal.id).all()
+
+    step(AdoptionRequest, request_rows(rng, next_id(AdoptionRequest), animals, requests_per_animal,
+                                       user_ids, now) if user_ids else [])
+    new_shelters = db.session.query(Shelter.name, Shelter.approved).filter(Shelter.id >= shelter_start)\
+                             .order_by(Shelter.id).all()
+    step(Notification, notification_rows(rng, next_id(Notification), notifications, user_ids, shelter_ids, now)
+                       if user_ids or shelter_ids else [])
+    write(Notification, admin_rows(rng, next_id(Notification), admin_id, new_shelters, now), batch_size)
+
+    reset_sequences([User, Shelter, Animal, AdoptionRequest, Notification])
+    rebuild_catalog()  # bulk inserts skip the ORM listeners that keep it current
+    return written
+
+
+def size_options(args):
+    sizes = dict(SCALES[args.scale])
+    for name in sizes:
+        value = getattr(args, name)
+        if value is not None:
+            sizes[name] = value
+    return sizes
+
+
+def add_size_arguments(parser):
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--users', type=int)
+    parser.add_argument('--shelters', type=int)
+    parser.add_argument('--animals-per-shelter', type=int, help="average per approved shelter")
+    parser.add_argument('--requests-per-animal', type=int, help="average per animal")
+    parser.add_argument('--notifications', type=int,
+                        help="total over users and shelters (the admin also gets one per new shelter)")
+    parser.add_argument('--seed', type=int, default=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_size_arguments(parser)
+    parser.add_argument('--database-url', help="defaults to DATABASE_URL / the app's database")
+    parser.add_argument('--password', default='password123')
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    parser.add_argument('--reset', action='store_true', help="delete every row first")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    from app import app
+    from migrations import upgrade_database
+
+    started = time.perf_counter()
+    with app.app_context():
+        db.create_all()
+        upgrade_database()
+        if args.reset:
+            clear_tables()
+        generate(seed=args.seed, password=args.password, batch_size=args.batch_size, **size_options(args))
+    print(f"Done in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+from models import db, Animal, Shelter
+from adoption_status import resolve_adoption_status
+from animal_search import search_animals
+from page_cache import cached
+
+# ---------------------- Flipbook Windows ----------------------
+# The flipbook is rendered a few pages at a time. Each animal page shows one
+# animal on the front and the details of the next animal on the back, kaya
+# bawat window ay may isang extra animal (the back of its last page). The
+# next window starts after the id of the last animal shown on a front.
+# Queries come from animal_search.search_animals, kaya pareho ang filters ng
+# flipbook, ng shelter dashboard at ng search box.
+
+FLIPBOOK_WINDOW = 6   # animal pages rendered with the page itself
+FLIPBOOK_BATCH = 6    # animal pages per request as the user flips
+
+
+# Returns (animals, next_cursor). animals has up to limit + 1 rows: the first
+# limit get a page each, the extra one is only the back of the last page.
+def animal_window(query, after=None, limit=FLIPBOOK_WINDOW):
+    if after is not None:
+        query = query.filter(Animal.id > after)
+    animals = query.order_by(Animal.id).limit(limit + 1).all()
+    if len(animals) > limit:
+        return animals, animals[limit - 1].id
+    return animals, None
+
+
+# Plain-dict copy of a row for the page cache (templates read it like the object)
+def snapshot(obj, exclude=('password',)):
+    return {attr.key: getattr(obj, attr.key) for attr in db.inspect(obj).mapper.column_attrs
+            if attr.key not in exclude}
+
+
+# Template context for flip_pages.html / flip_details.html
+# (animal_adopter holds the adopter's id and name, or None; a rename bumps
+# the version of every shelter the user adopted from, see user_profile)
+def window_context(animals, next_cursor, limit):
+    animal_status, adopters = resolve_adoption_status(animals)
+    rows = [snapshot(a) for a in animals]
+    return {
+        'page_animals': rows[:limit],
+        'animals_after': rows[1:],
+        'first_animal': rows[0] if rows else None,
+        'next_cursor': next_cursor,
+        'animal_status': animal_status,
+        'animal_adopter': {
+            animal_id: {'id': u.id, 'first_name': u.first_name, 'last_name': u.last_name} if u else None
+            for animal_id, u in adopters.items()
+        },
+    }
+
+
+# Filters shared by many viewers; free-text searches are not cached
+CACHEABLE_FILTERS = {'type', 'available'}
+
+
+# One window of a shelter's flipbook; with count=True it also has
+# total_animals. Cached per shelter version (page_cache.py).
+def flipbook_window(shelter_id, filters, after=None, limit=FLIPBOOK_WINDOW, count=False):
+    def load():
+        query = search_animals(shelter_id, filters)
+        animals, next_cursor = animal_window(query, after, limit)
+        context = window_context(animals, next_cursor, limit)
+        if count:
+            context['total_animals'] = query.count()
+        return context
+
+    if not set(filters) <= CACHEABLE_FILTERS:
+        return load()
+    key = ('flipbook', shelter_id, tuple(sorted(filters.items())), after, limit, count)
+    return cached(key, [('shelter', shelter_id)], load)
+
+
+# Shelter details for the flipbook cover, or None if it does not exist
+def shelter_details(shelter_id):
+    def load():
+        shelter = db.session.get(Shelter, shelter_id)
+        return snapshot(shelter) if shelter else None
+    return cached(('shelter_details', shelter_id), [('shelter', shelter_id)], load)
@@ -138,7 +138,7 @@ class AnimalForm(FlaskForm):
     image1 = FileField(
         "Image", validators=[DataRequired(),
         FileRequired(message="Image is required."),
-        FileAllowed(["jpg","jpeg","png"], "Images only!")])
+        FileAllowed(["jpg","jpeg","png","webp"], "Images only!")])
 
     submit = SubmitField(
         "Submit",
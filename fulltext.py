@@ -0,0 +1,190 @@
+import re
+from sqlalchemy import text
+from models import db, Shelter, Animal
+
+# ---------------------- Full-text Search ----------------------
+# Ranked search over animals (name, breed, description) and shelters (name,
+# description, address) of approved shelters.
+#   SQLite:     FTS5 tables animal_fts / shelter_fts, external content, kept
+#               in sync by triggers (walang kailangang tawagin ang routes).
+#   PostgreSQL: GIN indexes on a weighted to_tsvector(...) of the same
+#               columns (setweight per column, see FTS_WEIGHTS).
+# Results are ordered by relevance, then kind and id, and paged with a
+# keyset cursor like the notification feed.
+
+SEARCH_RESULTS_PER_PAGE = 20
+
+FTS_COLUMNS = {
+    'animal': ['name', 'breed', 'description'],
+    'shelter': ['name', 'description', 'address'],
+}
+
+# PostgreSQL ts_rank weights (A = 1.0, B = 0.4, C = 0.2, D = 0.1), in line
+# with the bm25() column weights used on SQLite in ranked_matches()
+FTS_WEIGHTS = {
+    'animal': {'name': 'A', 'breed': 'B', 'description': 'D'},
+    'shelter': {'name': 'A', 'description': 'D', 'address': 'C'},
+}
+
+WORD = re.compile(r'\w+', re.UNICODE)
+MAX_TERMS = 8
+
+
+def is_postgres():
+    return db.engine.dialect.name == 'postgresql'
+
+
+# ---------------------- Schema (migration step) ----------------------
+def sqlite_fts_statements(table, columns):
+    fts = f'{table}_fts'
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{c}' for c in columns)
+    old = ', '.join(f'old.{c}' for c in columns)
+    quoted = f'"{table}"'
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content={quoted}, "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {quoted} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {quoted} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {cols} ON {quoted} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        # Index the rows that already exist
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+# The indexes are on this exact expression, kaya dito rin dapat manggaling ang queries
+def tsvector(table, columns):
+    weights = FTS_WEIGHTS[table]
+    return ' || '.join(f"setweight(to_tsvector('simple', coalesce({table}.{c}, '')), '{weights[c]}')"
+                       for c in columns)
+
+
+def fulltext_statements(dialect_name):
+    statements = []
+    for table, columns in FTS_COLUMNS.items():
+        if dialect_name == 'postgresql':
+            statements.append(f'CREATE INDEX IF NOT EXISTS ix_{table}_search ON "{table}" '
+                              f'USING GIN (({tsvector(table, columns)}))')
+        else:
+            statements.extend(sqlite_fts_statements(table, columns))
+    return statements
+
+
+def upgrade_fulltext():
+    with db.engine.begin() as conn:
+        for statement in fulltext_statements(db.engine.dialect.name):
+            conn.execute(text(statement))
+
+
+# PostgreSQL indexes from before FTS_WEIGHTS were on the unweighted document
+def upgrade_fulltext_weights():
+    if not is_postgres():
+        return
+    with db.engine.begin() as conn:
+        for table in FTS_COLUMNS:
+            conn.execute(text(f'DROP INDEX IF EXISTS ix_{table}_search'))
+    upgrade_fulltext()
+
+
+# ---------------------- Queries ----------------------
+# User input -> terms; the last term is a prefix (search-as-you-type)
+def search_terms(q):
+    return [term.lower() for term in WORD.findall(q or '')][:MAX_TERMS]
+
+
+def match_expression(terms):
+    if is_postgres():
+        return ' & '.join(terms[:-1] + [terms[-1] + ':*'])
+    # Quoted so FTS5 operators in the input (AND, NEAR, "-") are plain words
+    return ' '.join([f'"{t}"' for t in terms[:-1]] + [f'"{terms[-1]}"*'])
+
+
+# (kind, id, rank) of every match; lower rank = better. Name and breed
+# weigh more than the description.
+def ranked_matches():
+    if is_postgres():
+        animal_doc = f"({tsvector('animal', FTS_COLUMNS['animal'])})"
+        shelter_doc = f"({tsvector('shelter', FTS_COLUMNS['shelter'])})"
+        return (
+            f"SELECT 'animal' AS kind, animal.id AS id, "
+            f"-ts_rank({animal_doc}, to_tsquery('simple', :match)) AS rank "
+            "FROM animal JOIN shelter ON shelter.id = animal.shelter_id "
+            f"WHERE {animal_doc} @@ to_tsquery('simple', :match) AND shelter.approved = true "
+            "UNION ALL "
+            f"SELECT 'shelter' AS kind, shelter.id AS id, "
+            f"-ts_rank({shelter_doc}, to_tsquery('simple', :match)) AS rank "
+            "FROM shelter "
+            f"WHERE {shelter_doc} @@ to_tsquery('simple', :match) AND shelter.approved = true"
+        )
+    return (
+        "SELECT 'animal' AS kind, animal_fts.rowid AS id, bm25(animal_fts, 10.0, 5.0, 1.0) AS rank "
+        "FROM animal_fts JOIN animal ON animal.id = animal_fts.rowid "
+        "JOIN shelter ON shelter.id = animal.shelter_id "
+        "WHERE animal_fts MATCH :match AND shelter.approved = 1 "
+        "UNION ALL "
+        "SELECT 'shelter' AS kind, shelter_fts.rowid AS id, bm25(shelter_fts, 10.0, 1.0, 2.0) AS rank "
+        "FROM shelter_fts JOIN shelter ON shelter.id = shelter_fts.rowid "
+        "WHERE shelter_fts MATCH :match AND shelter.approved = 1"
+    )
+
+
+def encode_cursor(row):
+    return f"{row.rank!r}_{row.kind}_{row.id}"
+
+
+def decode_cursor(value):
+    try:
+        rank, kind, row_id = value.rsplit('_', 2)
+        return float(rank), kind, int(row_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+# Returns (results, next_cursor); results are dicts for the JSON API
+def search(q, cursor=None, limit=SEARCH_RESULTS_PER_PAGE):
+    terms = search_terms(q)
+    if not terms:
+        return [], None
+
+    params = {'match': match_expression(terms), 'limit': limit + 1}
+    where = ''
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        where = ("WHERE rank > :rank OR (rank = :rank AND "
+                 "(kind > :kind OR (kind = :kind AND id > :id)))")
+        params.update(rank=position[0], kind=position[1], id=position[2])
+
+    rows = db.session.execute(text(
+        f"SELECT kind, id, rank FROM ({ranked_matches()}) AS matches {where} "
+        f"ORDER BY rank, kind, id LIMIT :limit"
+    ), params).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1])
+    return load_results(rows), next_cursor
+
+
+# One query per kind for the matched rows, in rank order
+def load_results(rows):
+    animal_ids = [row.id for row in rows if row.kind == 'animal']
+    shelter_ids = [row.id for row in rows if row.kind == 'shelter']
+    animals = {a.id: a for a in Animal.query.filter(Animal.id.in_(animal_ids))} if animal_ids else {}
+    shelters = {s.id: s for s in Shelter.query.filter(Shelter.id.in_(shelter_ids))} if shelter_ids else {}
+
+    results = []
+    for row in rows:
+        if row.kind == 'animal' and row.id in animals:
+            a = animals[row.id]
+            results.append({'kind': 'animal', 'id': a.id, 'name': a.name, 'breed': a.breed,
+                            'type': a.type, 'status': a.status, 'shelter_id': a.shelter_id,
+                            'image': a.image1})
+        elif row.kind == 'shelter' and row.id in shelters:
+            s = shelters[row.id]
+            results.append({'kind': 'shelter', 'id': s.id, 'name': s.name, 'address': s.address})
+    return results
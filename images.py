@@ -0,0 +1,211 @@
+import hashlib
+import os
+import re
+import sys
+import tempfile
+from flask import current_app, url_for
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, Animal
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:  # Pillow not installed: uploads are saved as-is
+    Image = None
+
+# ---------------------- Image Store ----------------------
+# Uploads are content-addressed: the file name is the SHA-256 of the uploaded
+# bytes, kaya hindi na nag-o-overwrite ang dalawang "dog.png" at ang parehong
+# photo ay isang beses lang naka-save. Each image is decoded once and saved as
+# WebP in three sizes (no EXIF/metadata):
+#   <hash>.webp        full  (Animal.image1 points here)
+#   <hash>.card.webp   card  (flipbook / dashboard pages)
+#   <hash>.thumb.webp  thumb (lists, previews)
+# Kung walang variant ang isang image (e.g. the bundled PNGs before running
+# `python images.py`), the original file is used. Files are written to a temp
+# file and renamed into place, so a half-written image is never served.
+
+IMAGE_SIZES = {'full': 1200, 'card': 480, 'thumb': 160}  # longest side, px
+IMAGE_EXT = '.webp'
+IMAGE_QUALITY = 80
+HASH_LENGTH = 40  # hex characters of the SHA-256 used in file names
+CHUNK_SIZE = 64 * 1024
+# Bigger uploads are refused before decoding (a small file can declare a
+# huge canvas, a "decompression bomb"); 50 MP is well above any phone camera
+MAX_IMAGE_PIXELS = 50_000_000
+if Image is not None:
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+CONTENT_ADDRESSED = re.compile(r'^[0-9a-f]{%d}(\.(card|thumb))?\.[a-z0-9]+$' % HASH_LENGTH)
+
+
+def upload_folder():
+    return os.path.join(current_app.root_path, current_app.config['UPLOAD_FOLDER'])
+
+
+def variant_name(filename, size):
+    stem = os.path.splitext(filename)[0]
+    if size == 'full':
+        return f"{stem}{IMAGE_EXT}"
+    return f"{stem}.{size}{IMAGE_EXT}"
+
+
+# Hashed names never change content, so browsers may cache them forever
+def is_content_addressed(filename):
+    return bool(CONTENT_ADDRESSED.match(os.path.basename(filename)))
+
+
+def atomic_save(image, path):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            image.save(f, 'WEBP', quality=IMAGE_QUALITY, method=4)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+# Writes every size of an already decoded image into folder. Each size is
+# resized from the next larger one; the full size is renamed into place last,
+# so its presence means all variants exist.
+def write_variants(image, stem, folder):
+    image = ImageOps.exif_transpose(image)  # keep the orientation before EXIF is dropped
+    if image.mode not in ('RGB', 'RGBA'):
+        has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    variants = []
+    for size, pixels in sorted(IMAGE_SIZES.items(), key=lambda item: -item[1]):
+        image = image.copy()
+        image.thumbnail((pixels, pixels), Image.LANCZOS)
+        variants.append((variant_name(stem + IMAGE_EXT, size), image))
+
+    for name, variant in reversed(variants):
+        atomic_save(variant, os.path.join(folder, name))
+    return f"{stem}{IMAGE_EXT}"
+
+
+def open_image(stream):
+    image = Image.open(stream)
+    # Pillow only warns between MAX_IMAGE_PIXELS and twice that
+    if image.width * image.height > MAX_IMAGE_PIXELS:
+        raise Image.DecompressionBombError(f"{image.width}x{image.height} image is too large")
+    # JPEGs can be decoded at a reduced scale straight away
+    image.draft('RGB', (IMAGE_SIZES['full'], IMAGE_SIZES['full']))
+    image.load()
+    return image
+
+
+# Streams the upload to a temp file in folder while hashing it
+def spool_upload(file, folder):
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.upload')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in iter(lambda: file.stream.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return tmp_path, digest.hexdigest()[:HASH_LENGTH]
+
+
+# Saves an uploaded FileStorage and returns the filename for Animal.image1.
+# Raises ValueError if the upload is not a readable image.
+def save_upload(file):
+    folder = upload_folder()
+    tmp_path, digest = spool_upload(file, folder)
+    try:
+        if Image is None:
+            ext = os.path.splitext(file.filename)[1].lower()
+            filename = digest + ext
+            if not os.path.exists(os.path.join(folder, filename)):
+                os.replace(tmp_path, os.path.join(folder, filename))
+            return filename
+
+        filename = digest + IMAGE_EXT
+        # Same photo already stored. If a concurrent release removed some of
+        # its files, they are written again below from this upload.
+        if all(os.path.exists(os.path.join(folder, name)) for name in image_files(filename)):
+            return filename
+        try:
+            with open(tmp_path, 'rb') as f:
+                image = open_image(f)
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+            raise ValueError("The uploaded file is not a valid image.") from e
+        return write_variants(image, digest, folder)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# Template helper: URL of the best available variant of an Animal.image1
+def image_url(filename, size='full'):
+    name = variant_name(filename, size)
+    if name != filename and not os.path.isfile(os.path.join(upload_folder(), name)):
+        name = filename
+    return url_for('static', filename='images/' + name)
+
+
+# Every file that belongs to an image (original + variants)
+def image_files(filename):
+    return {filename} | {variant_name(filename, size) for size in IMAGE_SIZES}
+
+
+# ---------------------- Reference-counted Cleanup ----------------------
+# Call after changing/deleting Animal.image1 values. Files (original + size
+# variants) are removed only after the transaction commits, and only if no
+# Animal.image1 points to them at that moment: the references are counted
+# after the commit on a fresh connection, kaya a request that has just
+# reused the same (deduplicated) photo keeps it.
+def release_images(filenames):
+    filenames = {name for name in filenames if name}
+    if filenames:
+        db.session.info.setdefault('images_to_release', set()).update(filenames)
+
+
+@event.listens_for(Session, 'after_commit')
+def _remove_files(session):
+    filenames = session.info.pop('images_to_release', None)
+    if not filenames:
+        return
+    with db.engine.connect() as conn:
+        still_used = set(conn.scalars(
+            db.select(Animal.image1).where(Animal.image1.in_(filenames)).distinct()
+        ))
+    folder = upload_folder()
+    for name in filenames - still_used:
+        for path in image_files(name):
+            try:
+                os.remove(os.path.join(folder, path))
+            except FileNotFoundError:
+                pass
+
+
+@event.listens_for(Session, 'after_rollback')
+def _keep_files(session):
+    session.info.pop('images_to_release', None)
+
+
+# ---------------------- Backfill ----------------------
+# python images.py [folder]  - builds variants for existing images
+# (originals are kept, para hindi masira ang mga existing Animal.image1)
+def build_missing_variants(folder):
+    built = 0
+    for name in sorted(os.listdir(folder)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in ('.png', '.jpg', '.jpeg') or os.path.exists(os.path.join(folder, f"{stem}.card{IMAGE_EXT}")):
+            continue
+        with open(os.path.join(folder, name), 'rb') as f:
+            write_variants(open_image(f), stem, folder)
+        built += 1
+    return built
+
+
+if __name__ == '__main__':
+    if Image is None:
+        sys.exit("Pillow is required: pip install Pillow")
+    folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'images')
+    print(f"Built variants for {build_missing_variants(folder)} images in {folder}")
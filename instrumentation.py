@@ -0,0 +1,230 @@
+import cProfile
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from flask import g, request, session, has_request_context, abort, current_app, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# ---------------------- Request Instrumentation ----------------------
+# Opt-in (INSTRUMENTATION_ENABLED). For every request it records:
+#   - total time, by endpoint, method and status
+#   - SQL statement count and time (SQLAlchemy cursor events)
+#   - template render time (Flask template signals)
+# Requests slower than SLOW_REQUEST_MS are logged with those numbers, and
+# every response gets a Server-Timing header (visible in the browser's
+# devtools). Totals are served at /metrics in the Prometheus text format,
+# to a logged-in admin or a scraper sending "Authorization: Bearer
+# <METRICS_TOKEN>"; everyone else gets a 404.
+#
+# Profiling: with PROFILE_REQUESTS every request runs under cProfile, or
+# only requests sending "X-Profile: 1" when PROFILE_ALLOW_HEADER is set.
+# The pstats dump is written to PROFILE_DIR, e.g.
+#   python -m pstats profiles/20261018-101500-123456-shelter_dashboard.prof
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the request duration histogram
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestMetrics:
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.requests = {}   # (endpoint, method, status) -> count
+        self.routes = {}     # (endpoint, method) -> totals
+
+    def record(self, endpoint, method, status, duration, sql_count, sql_time, template_time, slow):
+        with self.lock:
+            key = (endpoint, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            route = self.routes.setdefault((endpoint, method), {
+                'buckets': [0] * len(self.buckets), 'count': 0, 'duration': 0.0,
+                'sql_count': 0, 'sql_time': 0.0, 'template_time': 0.0, 'slow': 0,
+            })
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    route['buckets'][i] += 1
+            route['count'] += 1
+            route['duration'] += duration
+            route['sql_count'] += sql_count
+            route['sql_time'] += sql_time
+            route['template_time'] += template_time
+            route['slow'] += slow
+
+    def prometheus(self):
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        with self.lock:
+            requests = sorted(self.requests.items())
+            routes = sorted((key, dict(value, buckets=list(value['buckets'])))
+                            for key, value in self.routes.items())
+
+        metric('pawssion_requests_total', 'counter', 'Requests by endpoint, method and status.')
+        for (endpoint, method, status), count in requests:
+            lines.append(f'pawssion_requests_total{{{labels(endpoint, method)},status="{status}"}} {count}')
+
+        metric('pawssion_request_duration_seconds', 'histogram', 'Time spent handling the request.')
+        for (endpoint, method), route in routes:
+            route_labels = labels(endpoint, method)
+            for bound, count in zip(self.buckets, route['buckets']):
+                lines.append(f'pawssion_request_duration_seconds_bucket{{{route_labels},le="{bound}"}} {count}')
+            lines.append(f'pawssion_request_duration_seconds_bucket{{{route_labels},le="+Inf"}} {route["count"]}')
+            lines.append(f'pawssion_request_duration_seconds_sum{{{route_labels}}} {route["duration"]:.6f}')
+            lines.append(f'pawssion_request_duration_seconds_count{{{route_labels}}} {route["count"]}')
+
+        totals = [
+            ('pawssion_sql_queries_total', 'sql_count', 'SQL statements executed.'),
+            ('pawssion_sql_seconds_total', 'sql_time', 'Time spent in SQL statements.'),
+            ('pawssion_template_seconds_total', 'template_time', 'Time spent rendering templates.'),
+            ('pawssion_slow_requests_total', 'slow', 'Requests slower than SLOW_REQUEST_MS.'),
+        ]
+        for name, field, help_text in totals:
+            metric(name, 'counter', help_text)
+            for (endpoint, method), route in routes:
+                value = route[field]
+                value = f'{value:.6f}' if isinstance(value, float) else value
+                lines.append(f'{name}{{{labels(endpoint, method)}}} {value}')
+        return lines
+
+
+def labels(endpoint, method):
+    endpoint = (endpoint or 'none').replace('\\', '\\\\').replace('"', '\\"')
+    return f'endpoint="{endpoint}",method="{method}"'
+
+
+# Password hashing pool gauges (passwords.py), if it is set up
+def password_hash_lines(app):
+    hasher = app.extensions.get('password_hasher')
+    if hasher is None:
+        return []
+    stats = hasher.stats()
+    lines = []
+    for field, kind in (('in_flight', 'gauge'), ('queued', 'gauge'),
+                        ('completed', 'counter'), ('rejected', 'counter')):
+        name = f'pawssion_password_hash_{field}' + ('_total' if kind == 'counter' else '')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.append(f'{name} {stats[field]}')
+    return lines
+
+
+# ---------------------- Request Hooks ----------------------
+def _start_request():
+    g.instrumentation = {'start': time.perf_counter(), 'sql_count': 0, 'sql_time': 0.0,
+                         'template_time': 0.0, 'template_starts': [], 'profiler': None}
+    config = current_app.config
+    if config.get('PROFILE_REQUESTS') or (
+            config.get('PROFILE_ALLOW_HEADER') and request.headers.get('X-Profile') == '1'):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return  # another request on this process is already being profiled
+        g.instrumentation['profiler'] = profiler
+
+
+def _finish_request(response):
+    stats = g.pop('instrumentation', None)
+    if stats is None:
+        return response
+    duration = time.perf_counter() - stats['start']
+
+    if stats['profiler'] is not None:
+        stats['profiler'].disable()
+        dump_profile(stats['profiler'])
+
+    config = current_app.config
+    slow = duration * 1000 >= config.get('SLOW_REQUEST_MS', 500)
+    if slow:
+        logger.warning("Slow request: %s %s -> %s in %.0f ms (%d queries, %.0f ms SQL, %.0f ms templates)",
+                       request.method, request.full_path.rstrip('?'), response.status_code,
+                       duration * 1000, stats['sql_count'], stats['sql_time'] * 1000,
+                       stats['template_time'] * 1000)
+
+    current_app.extensions['request_metrics'].record(
+        request.endpoint, request.method, response.status_code, duration,
+        stats['sql_count'], stats['sql_time'], stats['template_time'], slow)
+
+    response.headers['Server-Timing'] = (
+        f'app;dur={duration * 1000:.1f}, '
+        f'db;dur={stats["sql_time"] * 1000:.1f};desc="{stats["sql_count"]} queries", '
+        f'tpl;dur={stats["template_time"] * 1000:.1f}'
+    )
+    return response
+
+
+def dump_profile(profiler):
+    folder = current_app.config.get('PROFILE_DIR', 'profiles')
+    os.makedirs(folder, exist_ok=True)
+    name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{request.endpoint or 'none'}.prof"
+    path = os.path.join(folder, name)
+    profiler.dump_stats(path)
+    logger.info("Profile of %s %s written to %s", request.method, request.path, path)
+
+
+def current_stats():
+    if has_request_context():
+        return g.get('instrumentation')
+    return None
+
+
+# ---------------------- SQL and Template Timing ----------------------
+# Statements outside a request (job worker, CLI) are not counted
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_stats() is not None:
+        conn.info.setdefault('instrumentation_starts', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    starts = conn.info.get('instrumentation_starts')
+    if stats is None or not starts:
+        return
+    stats['sql_count'] += 1
+    stats['sql_time'] += time.perf_counter() - starts.pop()
+
+
+def _before_render(app, template, context, **extra):
+    stats = current_stats()
+    if stats is not None:
+        stats['template_starts'].append(time.perf_counter())
+
+
+def _after_render(app, template, context, **extra):
+    stats = current_stats()
+    if stats is not None and stats['template_starts']:
+        started = stats['template_starts'].pop()
+        if not stats['template_starts']:  # nested render_template calls count once
+            stats['template_time'] += time.perf_counter() - started
+
+
+# ---------------------- Setup ----------------------
+def init_instrumentation(app):
+    if not app.config.get('INSTRUMENTATION_ENABLED'):
+        return
+    app.extensions['request_metrics'] = RequestMetrics()
+    # Attached here so a disabled app pays nothing per statement
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+
+
+def metrics_view():
+    token = current_app.config.get('METRICS_TOKEN')
+    scraper = token and request.headers.get('Authorization') == f'Bearer {token}'
+    if not scraper and session.get('role') != 'admin':
+        abort(404)
+    lines = current_app.extensions['request_metrics'].prometheus() + password_hash_lines(current_app)
+    return '\n'.join(lines) + '\n', 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
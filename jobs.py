@@ -0,0 +1,153 @@
+import json
+import logging
+import threading
+import traceback
+from datetime import datetime, timedelta
+from flask import current_app
+from models import db, Job
+
+# ---------------------- Background Jobs ----------------------
+# Mabibigat na trabaho (cascading deletes, malalaking notification fan-outs)
+# are saved as Job rows in the same transaction as the request that asked for
+# them, then run by a worker thread. A handler's writes and the job's "done"
+# status are committed together, so a crash mid-job rolls everything back and
+# the job is simply run again. Handlers must therefore be idempotent.
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+POLL_INTERVAL = 2            # seconds between checks when the queue is empty
+RETRY_DELAY = 30             # seconds, multiplied by the attempt number
+STALE_AFTER = timedelta(minutes=10)  # running jobs older than this are re-queued
+
+
+def job_handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+# Adds a job to the current session; it is saved by the caller's commit.
+# Call dispatch(job.id) after committing.
+def enqueue(kind, max_attempts=3, **payload):
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = Job(kind=kind, payload=json.dumps(payload), max_attempts=max_attempts)
+    db.session.add(job)
+    return job
+
+
+def dispatch(job_id):
+    if current_app.config.get('JOBS_INLINE'):
+        run_job(job_id)
+    else:
+        start_worker(current_app._get_current_object())
+
+
+# Claims a queued job, runs it, and records the outcome. Returns True if the
+# job was claimed by this call.
+def run_job(job_id):
+    now = datetime.now()
+    claimed = db.session.execute(
+        db.update(Job)
+          .where(Job.id == job_id, Job.status == 'queued', Job.run_after <= now)
+          .values(status='running', attempts=Job.attempts + 1, updated_at=now)
+    ).rowcount
+    db.session.commit()
+    if not claimed:
+        return False
+
+    job = db.session.get(Job, job_id)
+    try:
+        HANDLERS[job.kind](**json.loads(job.payload))
+        job.status = 'done'
+        job.error = None
+        job.updated_at = datetime.now()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        job.error = traceback.format_exc(limit=5)
+        job.updated_at = datetime.now()
+        if job.attempts < job.max_attempts:
+            job.status = 'queued'
+            job.run_after = datetime.now() + timedelta(seconds=RETRY_DELAY * job.attempts)
+        else:
+            job.status = 'failed'
+        db.session.commit()
+        logger.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+    return True
+
+
+# Jobs left 'running' by a crashed worker go back to the queue
+def requeue_stale_jobs():
+    cutoff = datetime.now() - STALE_AFTER
+    db.session.execute(
+        db.update(Job)
+          .where(Job.status == 'running', Job.updated_at < cutoff)
+          .values(status='queued', run_after=datetime.now())
+    )
+    db.session.commit()
+
+
+def next_job_id():
+    return db.session.query(Job.id)\
+                     .filter(Job.status == 'queued', Job.run_after <= datetime.now())\
+                     .order_by(Job.run_after, Job.id)\
+                     .limit(1)\
+                     .scalar()
+
+
+# ---------------------- Worker Thread ----------------------
+class JobWorker(threading.Thread):
+    def __init__(self, app):
+        super().__init__(name='pawssion-jobs', daemon=True)
+        self.app = app
+        self.wakeup = threading.Event()
+
+    def run(self):
+        with self.app.app_context():
+            requeue_stale_jobs()
+            while True:
+                try:
+                    job_id = next_job_id()
+                    if job_id is not None:
+                        run_job(job_id)
+                        continue
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Job worker error")
+                finally:
+                    db.session.remove()
+                self.wakeup.wait(POLL_INTERVAL)
+                self.wakeup.clear()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+# Starts the worker once per process, or wakes it up if it is already running
+def start_worker(app):
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = JobWorker(app)
+            _worker.start()
+        else:
+            _worker.wakeup.set()
+    return _worker
+
+
+def job_status(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'attempts': job.attempts,
+        'error': job.error,
+        'created_at': job.created_at.isoformat(),
+        'updated_at': job.updated_at.isoformat(),
+    }
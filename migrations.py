@@ -0,0 +1,132 @@
+import os
+from sqlalchemy import inspect, text
+from models import db, CatalogEntry, ContentVersion
+from adoption_status import backfill_animal_status
+from fulltext import upgrade_fulltext, upgrade_fulltext_weights
+from catalog import rebuild_catalog
+
+# ---------------------- Database Upgrades ----------------------
+# db.create_all() only creates missing tables, hindi nito ina-add ang bagong
+# columns/indexes sa existing pawssion.db. Each schema version below lists
+# the steps that bring a database from the previous version up to it; the
+# applied version is recorded in the schema_version table.
+
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database')
+
+
+# Animal.status / Animal.adopter_id (denormalized adoption status)
+def upgrade_animal_status():
+    columns = {c['name'] for c in inspect(db.engine).get_columns('animal')}
+    if 'status' in columns and 'adopter_id' in columns:
+        return
+
+    with db.engine.begin() as conn:
+        if 'status' not in columns:
+            conn.execute(text("ALTER TABLE animal ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'Available'"))
+        if 'adopter_id' not in columns:
+            conn.execute(text('ALTER TABLE animal ADD COLUMN adopter_id INTEGER REFERENCES "user" (id)'))
+
+    # Fill the new columns from existing approved adoption requests
+    backfill_animal_status()
+
+
+# catalog_entry read model, filled from the current animals (catalog.py)
+def upgrade_catalog():
+    CatalogEntry.__table__.create(db.engine, checkfirst=True)
+    rebuild_catalog()
+
+
+# content_version counters for ETags / page cache keys (versions.py); a
+# missing row reads as version 0, kaya walang backfill
+def upgrade_content_versions():
+    ContentVersion.__table__.create(db.engine, checkfirst=True)
+
+
+# Notification.message was VARCHAR(200), too short for messages built from
+# long names. SQLite never enforces the length, only PostgreSQL needs this.
+def upgrade_notification_message():
+    if db.engine.dialect.name != 'postgresql':
+        return
+    with db.engine.begin() as conn:
+        conn.execute(text("ALTER TABLE notification ALTER COLUMN message TYPE TEXT"))
+
+
+# SQLite keeps DateTime columns as text and compares them as text. SQLAlchemy
+# writes 'YYYY-MM-DD HH:MM:SS.ffffff', pero ang lumang rows (seed.sql, the
+# original app) have '12:33:27.24' or no fraction at all, which sorts before
+# the same instant written by SQLAlchemy and breaks the feed cursor. Pads every
+# timestamp to the SQLAlchemy format; PostgreSQL has real timestamps.
+TIMESTAMP_COLUMNS = [('notification', 'timestamp'), ('adoption_request', 'timestamp')]
+
+
+def normalize_timestamps():
+    if db.engine.dialect.name != 'sqlite':
+        return
+    with db.engine.begin() as conn:
+        for table, column in TIMESTAMP_COLUMNS:
+            conn.execute(text(
+                f"UPDATE {table} SET {column} = replace(substr({column}, 1, 19), 'T', ' ') || '.' || "
+                f"substr(substr({column}, 21) || '000000', 1, 6) "
+                f"WHERE length({column}) != 26 OR substr({column}, 11, 1) = 'T'"
+            ))
+
+
+# Runs a database/schema_vN.sql file statement by statement
+def run_schema_file(filename):
+    with open(os.path.join(SCHEMA_DIR, filename)) as f:
+        lines = [line for line in f if not line.strip().startswith('--')]
+
+    with db.engine.begin() as conn:
+        for statement in ''.join(lines).split(';'):
+            if statement.strip():
+                conn.execute(text(statement))
+
+
+# ---------------------- Seed Data ----------------------
+# database/seed.sql only inserts the original tables, with the original
+# timestamp format. Status/adopter and the
+# catalog_entry read model are derived from those rows, kaya nire-rebuild
+# pagkatapos mag-load (upgrade_database() only does that when a column is
+# first added). Run on a database that is already at SCHEMA_VERSION.
+def load_seed(filename='seed.sql'):
+    run_schema_file(filename)
+    normalize_timestamps()
+    backfill_animal_status()
+    rebuild_catalog()
+
+
+# version -> steps (callables or schema files), applied in order
+MIGRATIONS = {
+    2: [upgrade_animal_status, 'schema_v2.sql'],
+    3: ['schema_v3.sql'],
+    4: ['schema_v4.sql'],
+    5: [upgrade_fulltext],
+    6: [upgrade_catalog],
+    7: [upgrade_content_versions],
+    8: [upgrade_notification_message],
+    9: [upgrade_fulltext_weights],
+    10: [normalize_timestamps],
+}
+SCHEMA_VERSION = max(MIGRATIONS)
+
+
+def get_schema_version():
+    with db.engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+        version = conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar()
+    # Databases from before versioning are at schema_v1
+    return version or 1
+
+
+def upgrade_database():
+    current = get_schema_version()
+    for version in sorted(MIGRATIONS):
+        if version <= current:
+            continue
+        for step in MIGRATIONS[version]:
+            if isinstance(step, str):
+                run_schema_file(step)
+            else:
+                step()
+        with db.engine.begin() as conn:
+            conn.execute(text("INSERT INTO schema_version (version) VALUES (:v)"), {'v': version})
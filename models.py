@@ -1,9 +1,30 @@
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import CheckConstraint
+from sqlalchemy import CheckConstraint, event
 from datetime import datetime
 
 db = SQLAlchemy()
 
+
+# Binds db to the app and applies the configured SQLITE_PRAGMAS to every
+# new SQLite connection (WAL, busy_timeout, cache sizes... see config.py)
+def init_db(app):
+    db.init_app(app)
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if not pragmas:
+        return
+
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
 # ----------------- Users (Admin + Regular User) -----------------
 class User(db.Model):
      
@@ -40,7 +61,7 @@ class Shelter(db.Model):
     website = db.Column(db.String(150), unique=True, nullable=True)
     date_established = db.Column(db.String(50), nullable=False)
     shelter_type = db.Column(db.String(50), nullable=False)
-    approved = db.Column(db.Boolean, nullable=True, default=None)
+    approved = db.Column(db.Boolean, nullable=True, default=None, index=True)
     role = db.Column(db.String(20),  nullable=False, default="shelter")
     password = db.Column(db.String(200), nullable=False)
     animals = db.relationship('Animal', backref='shelter', lazy=True)
@@ -58,10 +79,46 @@ class Animal(db.Model):
     description = db.Column(db.Text, nullable=False)
     image1 = db.Column(db.String(200), nullable=False)
     shelter_id = db.Column(db.Integer, db.ForeignKey('shelter.id'), nullable=False)
+    # Denormalized from the approved AdoptionRequest; kept in sync by the adoption routes
+    status = db.Column(db.String(20), nullable=False, default='Available', server_default='Available',
+                       index=True)  # Available, Adopted
+    adopter_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    adopter = db.relationship('User', foreign_keys=[adopter_id], lazy=True)
     adoption_requests = db.relationship('AdoptionRequest', backref='animal', lazy=True)   
     
+# age is stored as text ("2"); searches compare it as a number
+animal_age_years = db.cast(db.func.nullif(Animal.age, ''), db.Integer)
+
+# Animal listings/search filter on shelter + lower(type) [+ status], and on age ranges
+db.Index('ix_animal_shelter_type_status', Animal.shelter_id, db.func.lower(Animal.type), Animal.status)
+db.Index('ix_animal_shelter_age', Animal.shelter_id, animal_age_years)
+
+# ----------------- Adoption Catalog (read model) -----------------
+# One row per adoptable animal (Available, approved shelter) for /browse.
+# Maintained by catalog.py; never edited directly.
+class CatalogEntry(db.Model):
+    __table_args__ = (
+        db.Index('ix_catalog_entry_type_animal', 'type', 'animal_id'),
+    )
+
+    animal_id = db.Column(db.Integer, db.ForeignKey('animal.id', ondelete='CASCADE'), primary_key=True)
+    shelter_id = db.Column(db.Integer, db.ForeignKey('shelter.id', ondelete='CASCADE'), nullable=False, index=True)
+    shelter_name = db.Column(db.String(150))
+    name = db.Column(db.String(50))
+    type = db.Column(db.String(50), nullable=False)  # lowercase, e.g. 'dog'
+    breed = db.Column(db.String(50), nullable=False)
+    gender = db.Column(db.String(10), nullable=False)
+    age = db.Column(db.String(20))
+    image1 = db.Column(db.String(200), nullable=False)
+
+
 # ----------------- Adoption Requests -----------------
 class AdoptionRequest(db.Model):
+    __table_args__ = (
+        db.Index('ix_adoption_request_animal_status', 'animal_id', 'status'),
+        db.Index('ix_adoption_request_user_animal', 'user_id', 'animal_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True,  nullable=False, unique=True)
     reason = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(20), nullable=False, default='pending')  # pending, approved, rejected
@@ -74,8 +131,43 @@ class AdoptionRequest(db.Model):
 # ----------------- Notifications -----------------
 class Notification(db.Model):
     id = db.Column(db.Integer, primary_key=True,  nullable=False, unique=True)
-    message = db.Column(db.String(200))
+    message = db.Column(db.Text)  # long shelter/animal/user names; PostgreSQL enforces VARCHAR lengths
     timestamp = db.Column(db.DateTime, nullable=False, default=datetime.now)
     read = db.Column(db.Boolean, default=False) 
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
-    shelter_id = db.Column(db.Integer, db.ForeignKey('shelter.id'), nullable=True)
\ No newline at end of file
+    shelter_id = db.Column(db.Integer, db.ForeignKey('shelter.id'), nullable=True)
+
+
+# ----------------- Background Jobs -----------------
+class Job(db.Model):
+    __table_args__ = (
+        db.Index('ix_job_status_run_after', 'status', 'run_after'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, nullable=False, unique=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')  # JSON arguments ng handler
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    error = db.Column(db.Text, nullable=True)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+
+# ----------------- Content Versions -----------------
+# Change counters per shelter / principal (versions.py); bumped in the same
+# transaction as the write, read for ETags and page cache keys
+class ContentVersion(db.Model):
+    scope = db.Column(db.String(30), primary_key=True)      # e.g. 'shelter', 'user'
+    scope_id = db.Column(db.Integer, primary_key=True)      # 0 for global scopes
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+
+# Notification feeds: unread badge counts and newest-first lists per principal
+db.Index('ix_notification_user_read', Notification.user_id, Notification.read)
+db.Index('ix_notification_user_feed', Notification.user_id, Notification.timestamp.desc(), Notification.id.desc())
+db.Index('ix_notification_shelter_read', Notification.shelter_id, Notification.read)
+db.Index('ix_notification_shelter_feed', Notification.shelter_id, Notification.timestamp.desc(), Notification.id.desc())
@@ -0,0 +1,278 @@
+import json
+from collections import Counter
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from models import db, User, Notification, Job
+from cache import TTLCache
+from jobs import job_handler, start_worker
+from versions import bump_version
+
+# ---------------------- Notification Feed ----------------------
+# Notifications are paged newest-first by (timestamp, id). The cursor is the
+# last notification of the previous page, kaya hindi lumalala ang query kahit
+# libo-libo na ang notifications ng isang account (walang OFFSET).
+
+NOTIFICATIONS_PER_PAGE = 20
+DASHBOARD_NOTIFICATIONS = 5
+
+
+# Users and admins receive notifications by user_id, shelters by shelter_id
+def principal_filter(role, principal_id):
+    if role == 'shelter':
+        return Notification.shelter_id == principal_id
+    return Notification.user_id == principal_id
+
+
+def feed_query(role, principal_id):
+    return Notification.query.filter(principal_filter(role, principal_id))\
+                             .order_by(Notification.timestamp.desc(), Notification.id.desc())
+
+
+def latest_notifications(role, principal_id, limit=DASHBOARD_NOTIFICATIONS):
+    return feed_query(role, principal_id).limit(limit).all()
+
+
+def encode_cursor(note):
+    return f"{note.timestamp.isoformat()}_{note.id}"
+
+
+def decode_cursor(value):
+    try:
+        timestamp, note_id = value.rsplit('_', 1)
+        return datetime.fromisoformat(timestamp), int(note_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+# Returns (notifications, next_cursor); next_cursor is None on the last page
+def notification_page(role, principal_id, cursor=None, limit=NOTIFICATIONS_PER_PAGE):
+    query = feed_query(role, principal_id)
+
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        query = query.filter(
+            db.tuple_(Notification.timestamp, Notification.id) < db.tuple_(*position)
+        )
+
+    # Fetch one extra row to know if there is an older page
+    notifications = query.limit(limit + 1).all()
+    if len(notifications) > limit:
+        notifications = notifications[:limit]
+        return notifications, encode_cursor(notifications[-1])
+    return notifications, None
+
+
+# Marks the given notifications read with one UPDATE; returns how many changed
+def mark_read(notifications):
+    unread = [note for note in notifications if not note.read]
+    if not unread:
+        return 0
+
+    update = db.update(Notification)\
+               .where(Notification.id.in_([note.id for note in unread]), Notification.read.is_(False))\
+               .values(read=True)
+    options = {'synchronize_session': False}
+    if db.engine.dialect.update_returning:
+        # Only the rows this UPDATE changed: two tabs marking the same page
+        # must not both lower the badge
+        changed = db.session.execute(update.returning(Notification.user_id, Notification.shelter_id),
+                                     execution_options=options).all()
+    else:
+        db.session.execute(update, execution_options=options)
+        changed = None
+    # Read before the commit expires the rows (else one SELECT per note)
+    recipients = changed if changed is not None else [(note.user_id, note.shelter_id) for note in unread]
+    for user_id, shelter_id in recipients:
+        bump_recipient(user_id, shelter_id)
+    db.session.commit()
+
+    keys = Counter(key for user_id, shelter_id in recipients for key in unread_keys(user_id, shelter_id))
+    if changed is None:
+        # Without RETURNING the changed rows are unknown; count again next time
+        for key in keys:
+            unread_cache.delete(key)
+        return len(unread)
+
+    # Write-through: the badge counts drop by what was just marked read
+    for key, count in keys.items():
+        remaining = unread_cache.incr(key, -count)
+        if remaining is not None and remaining < 0:
+            unread_cache.delete(key)
+    return len(changed)
+
+
+# ---------------------- Unread Counters ----------------------
+# Per-principal unread counts for the dashboard badges. A count is computed
+# once with COUNT(*), then kept current: +1 for every Notification inserted
+# (applied when the transaction commits) and -n when /notifications marks
+# n items read. The TTL bounds drift if another process writes notifications.
+
+unread_cache = TTLCache(maxsize=10000, ttl=300)
+
+
+def unread_key(role, principal_id):
+    return ('shelter' if role == 'shelter' else 'user', principal_id)
+
+
+# Cache keys of every principal that sees this notification in its feed
+def unread_keys(user_id, shelter_id):
+    keys = []
+    if user_id is not None:
+        keys.append(('user', user_id))
+    if shelter_id is not None:
+        keys.append(('shelter', shelter_id))
+    return keys
+
+
+# Dashboards show the feed and badge, kaya bawat bagong/nabasang
+# notification ay nagbabago ng page version ng recipient (versions.py)
+def bump_recipient(user_id, shelter_id):
+    if user_id is not None:
+        bump_version('user', user_id)
+    if shelter_id is not None:
+        bump_version('shelter_account', shelter_id)
+
+
+def get_unread_count(role, principal_id):
+    key = unread_key(role, principal_id)
+    count = unread_cache.get(key)
+    if count is None:
+        count = Notification.query.filter(principal_filter(role, principal_id),
+                                          Notification.read.is_(False)).count()
+        unread_cache.set(key, count)
+    return count
+
+
+# Bumps waiting for the current transaction to commit
+def pending_unread(session):
+    return session.info.setdefault('pending_unread', Counter())
+
+
+@event.listens_for(Notification, 'after_insert')
+def _count_inserted(mapper, connection, note):
+    session = object_session(note)
+    if session is not None and not note.read:
+        pending_unread(session).update(unread_keys(note.user_id, note.shelter_id))
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_unread_bumps(session):
+    for key, count in session.info.pop('pending_unread', {}).items():
+        unread_cache.incr(key, count)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_unread_bumps(session):
+    session.info.pop('pending_unread', None)
+    session.info.pop('outgoing_notifications', None)
+    session.info.pop('wake_job_worker', None)
+
+
+# ---------------------- Notification Fan-out ----------------------
+# Routes call notify()/notify_admin() instead of adding Notification rows one
+# by one. Messages are collected on the session and written with a single
+# bulk INSERT when the request's transaction commits. Very large fan-outs are
+# saved as one background job instead and inserted by the job worker.
+
+FANOUT_JOB_THRESHOLD = 500
+
+admin_cache = TTLCache(maxsize=1, ttl=600)
+
+
+def outgoing_notifications(session):
+    return session.info.setdefault('outgoing_notifications', [])
+
+
+def notify(message, user_id=None, shelter_id=None, timestamp=None):
+    bump_recipient(user_id, shelter_id)
+    outgoing_notifications(db.session).append({
+        'message': message,
+        'user_id': user_id,
+        'shelter_id': shelter_id,
+        'timestamp': timestamp or datetime.now(),
+        'read': False,
+    })
+
+
+# The admin account rarely changes, kaya naka-cache ang id niya (0 = no admin)
+def get_admin_id():
+    admin_id = admin_cache.get('admin_id')
+    if admin_id is None:
+        admin_id = db.session.query(User.id).filter_by(role='admin')\
+                                            .order_by(User.id).limit(1).scalar() or 0
+        admin_cache.set('admin_id', admin_id)
+    return admin_id or None
+
+
+def notify_admin(message):
+    admin_id = get_admin_id()
+    if admin_id:
+        notify(message, user_id=admin_id)
+
+
+def write_notifications(session, rows):
+    session.execute(db.insert(Notification), rows)
+    pending_unread(session).update(key for row in rows
+                                  for key in unread_keys(row['user_id'], row['shelter_id']))
+
+
+# Set-based fan-out: one INSERT ... SELECT for every row of select_stmt, which
+# must return user_id, shelter_id and message columns. Used by the cascades
+# para hindi na i-load isa-isa ang mga apektadong rows.
+def notify_from_select(select_stmt):
+    rows = select_stmt.subquery()
+
+    # Badge counts per recipient, for the unread counters
+    counts = db.session.execute(
+        db.select(rows.c.user_id, rows.c.shelter_id, db.func.count())
+          .group_by(rows.c.user_id, rows.c.shelter_id)
+    ).all()
+    for user_id, shelter_id, count in counts:
+        for key in unread_keys(user_id, shelter_id):
+            pending_unread(db.session)[key] += count
+        bump_recipient(user_id, shelter_id)
+
+    db.session.execute(
+        db.insert(Notification).from_select(
+            ['user_id', 'shelter_id', 'message', 'timestamp', 'read'],
+            db.select(rows.c.user_id, rows.c.shelter_id, rows.c.message,
+                      db.literal(datetime.now()), db.literal(False))
+        )
+    )
+
+
+# Notifications being deleted (e.g. with their shelter) no longer count
+def forget_unread_count(role, principal_id):
+    unread_cache.delete(unread_key(role, principal_id))
+
+
+@event.listens_for(Session, 'before_commit')
+def _write_outgoing_notifications(session):
+    rows = session.info.pop('outgoing_notifications', None)
+    if not rows:
+        return
+
+    if len(rows) > FANOUT_JOB_THRESHOLD and not current_app.config.get('JOBS_INLINE'):
+        # Saved in the same transaction, delivered by the job worker
+        payload = [dict(row, timestamp=row['timestamp'].isoformat()) for row in rows]
+        session.add(Job(kind='send_notifications', payload=json.dumps({'rows': payload})))
+        session.info['wake_job_worker'] = True
+        return
+
+    write_notifications(session, rows)
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_job_worker(session):
+    if session.info.pop('wake_job_worker', False):
+        start_worker(current_app._get_current_object())
+
+
+@job_handler('send_notifications')
+def send_notifications(rows):
+    for row in rows:
+        row['timestamp'] = datetime.fromisoformat(row['timestamp'])
+        bump_recipient(row['user_id'], row['shelter_id'])
+    write_notifications(db.session, rows)
@@ -0,0 +1,55 @@
+from flask import current_app
+from werkzeug.utils import import_string
+from versions import bump_version, current_versions
+
+# ---------------------- Page Cache ----------------------
+# Caches rendered fragments and listing data that are the same for every
+# viewer (shelter list, flipbook windows). Every key includes the version of
+# the data it was built from, e.g. ('shelter', 3) for shelter 3's animals.
+# Routes that change the data call invalidate(...), which bumps the content
+# version in the same transaction (versions.py), kaya ang lumang entries ay
+# hindi na nababasa at naaalis na lang ng LRU/TTL. A reader that raced with
+# the write stored its result under the old version, so nothing stale is served.
+#
+# The backend is PAGE_CACHE_BACKEND (import path of a class taking maxsize
+# and ttl, with the cache.TTLCache methods). Versions are shared through the
+# database, so other worker processes stop using old entries within
+# versions.VERSION_CACHE_TTL.
+
+def init_page_cache(app):
+    backend = import_string(app.config.get('PAGE_CACHE_BACKEND', 'cache.TTLCache'))
+    app.extensions['page_cache'] = backend(maxsize=app.config.get('PAGE_CACHE_SIZE', 1024),
+                                           ttl=app.config.get('PAGE_CACHE_TTL', 300))
+
+
+def page_cache():
+    return current_app.extensions['page_cache']
+
+
+# Returns the cached value for key at the current versions of scopes
+# (list of (scope, scope_id)), computing and storing it on a miss
+def cached(key, scopes, compute):
+    if not current_app.config.get('PAGE_CACHE_ENABLED', True):
+        return compute()
+    versions = current_versions(scopes)
+    versioned_key = tuple(key) + tuple(version for version, _ in versions.values())
+    value = page_cache().get(versioned_key)
+    if value is None:
+        value = compute()
+        if value is not None:
+            page_cache().set(versioned_key, value)
+    return value
+
+
+# ---------------------- Invalidation ----------------------
+# Scopes: ('shelters', None) = list of approved shelters,
+#         ('shelter', id)    = a shelter's details and animals
+def invalidate(scope, scope_id=None):
+    bump_version(scope, scope_id)
+
+
+def invalidate_shelter(shelter_id, listing=False):
+    invalidate('shelter', shelter_id)
+    if listing:
+        invalidate('shelters')
+
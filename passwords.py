@@ -0,0 +1,140 @@
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+# ---------------------- Password Hashing ----------------------
+# scrypt is slow on purpose (tens of ms of CPU, ~32 MB of memory per call).
+# Login and registration send the work to a small process pool instead of
+# hashing on the request thread. At most PASSWORD_HASH_MAX_PENDING hashes
+# may be running or queued; beyond that a request waits up to
+# PASSWORD_HASH_QUEUE_TIMEOUT seconds for a slot, then gets HashingBusy
+# (503) instead of piling up behind a login burst.
+#
+# PASSWORD_HASH_WORKERS = 0 hashes on the request thread (development),
+# still with the same cap and stats.
+#
+# New hashes use PASSWORD_HASH_METHOD. Stored hashes with other parameters
+# are re-hashed on the next successful login (needs_rehash), kaya puwedeng
+# baguhin ang cost nang walang naka-lock out.
+
+
+class HashingBusy(Exception):
+    pass
+
+
+# 'scrypt' -> 'scrypt:32768:8:1', 'pbkdf2' -> 'pbkdf2:sha256:<iterations>',
+# the same method string werkzeug writes in front of the hash
+def full_method(method):
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        defaults = ['32768', '8', '1']
+    elif name == 'pbkdf2':
+        defaults = ['sha256', str(DEFAULT_PBKDF2_ITERATIONS)]
+    else:
+        return method
+    return ':'.join([name] + args + defaults[len(args):])
+
+
+class PasswordHasher:
+    def __init__(self, method='scrypt', workers=0, max_pending=8, queue_timeout=5.0):
+        self.method = full_method(method)
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.pool = None
+        self.pool_pid = None
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+
+    # Created on first use, and again in a forked worker process. Checked
+    # again under the lock, kaya isang pool lang kahit sabay ang unang requests.
+    def executor(self):
+        pid = os.getpid()
+        if self.pool is None or self.pool_pid != pid:
+            with self.lock:
+                if self.pool is None or self.pool_pid != pid:
+                    pool = ProcessPoolExecutor(max_workers=self.workers)
+                    atexit.register(pool.shutdown, wait=False, cancel_futures=True)
+                    self.pool, self.pool_pid = pool, pid
+        return self.pool
+
+    def run(self, func, *args):
+        if not self.slots.acquire(timeout=self.queue_timeout):
+            with self.lock:
+                self.rejected += 1
+            raise HashingBusy()
+
+        with self.lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            if self.workers:
+                return self.executor().submit(func, *args).result()
+            return func(*args)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self.busy_seconds += time.perf_counter() - started
+            self.slots.release()
+
+    def hash(self, password):
+        return self.run(generate_password_hash, password, self.method)
+
+    def verify(self, stored, password):
+        return self.run(check_password_hash, stored, password)
+
+    def needs_rehash(self, stored):
+        return stored.split('$', 1)[0] != self.method
+
+    # queued = waiting for a pool process (in_flight beyond the workers)
+    def stats(self):
+        with self.lock:
+            return {
+                'method': self.method,
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'in_flight': self.in_flight,
+                'queued': max(self.in_flight - max(self.workers, 1), 0),
+                'peak_in_flight': self.peak_in_flight,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'avg_ms': round(self.busy_seconds * 1000 / self.completed, 1) if self.completed else None,
+            }
+
+
+def init_password_hashing(app):
+    app.extensions['password_hasher'] = PasswordHasher(
+        method=app.config.get('PASSWORD_HASH_METHOD', 'scrypt'),
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 0),
+        max_pending=app.config.get('PASSWORD_HASH_MAX_PENDING', 8),
+        queue_timeout=app.config.get('PASSWORD_HASH_QUEUE_TIMEOUT', 5.0),
+    )
+
+
+def password_hasher():
+    return current_app.extensions['password_hasher']
+
+
+def hash_password(password):
+    return password_hasher().hash(password)
+
+
+def check_password(stored, password):
+    return password_hasher().verify(stored, password)
+
+
+# New hash with the current parameters if stored uses other ones, else None
+def upgraded_hash(stored, password):
+    hasher = password_hasher()
+    return hasher.hash(password) if hasher.needs_rehash(stored) else None
@@ -0,0 +1,49 @@
+from collections import namedtuple
+from models import db, User, Shelter
+from passwords import check_password, upgraded_hash
+
+# ---------------------- Principals ----------------------
+# Users/admins and shelters log in with the same form, and an email may
+# belong to only one of them. find_principals() looks the email up in both
+# tables with one UNION ALL query, each branch using the table's unique
+# email index; registration also checks the username in the same query.
+# Reading the source tables directly means there is no copy of the
+# credentials to keep in sync (or to backfill).
+
+Principal = namedtuple('Principal', 'kind id role password approved')
+
+MODELS = {'user': User, 'shelter': Shelter}
+
+
+# Returns {kind: Principal}. Kinds: 'user' and 'shelter' for the email and,
+# if username is given, 'username' for the user who has that username
+# (without its password).
+def find_principals(email, username=None):
+    branches = [
+        db.select(db.literal('user').label('kind'), User.id, User.role, User.password,
+                  db.type_coerce(db.null(), db.Boolean).label('approved'))
+          .where(User.email == email),
+        db.select(db.literal('shelter'), Shelter.id, db.literal('shelter'), Shelter.password,
+                  Shelter.approved)
+          .where(Shelter.email == email),
+    ]
+    if username is not None:
+        branches.append(
+            db.select(db.literal('username'), User.id, User.role, db.null(), db.null())
+              .where(User.username == username)
+        )
+    rows = db.session.execute(db.union_all(*branches)).all()
+    return {row.kind: Principal(*row) for row in rows}
+
+
+# Checks the password; on success an outdated hash is replaced with one
+# using the current parameters (passwords.py) and committed
+def verify_principal(principal, password):
+    if not check_password(principal.password, password):
+        return False
+    new_hash = upgraded_hash(principal.password, password)
+    if new_hash:
+        model = MODELS[principal.kind]
+        db.session.execute(db.update(model).where(model.id == principal.id).values(password=new_hash))
+        db.session.commit()
+    return True
@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from flask import current_app
+from werkzeug.utils import import_string
+
+# ---------------------- Login Rate Limiting ----------------------
+# Sliding-window limits checked before any database or hashing work:
+#   per IP:    every login POST (LOGIN_LIMIT_PER_IP per LOGIN_LIMIT_WINDOW)
+#   per email: failed attempts (LOGIN_LIMIT_PER_EMAIL per LOGIN_LIMIT_WINDOW),
+#              cleared by a successful login
+# Emails with no account are remembered for UNKNOWN_EMAIL_TTL seconds, kaya
+# ang paulit-ulit na bogus attempts ay hindi na umaabot sa database o scrypt.
+# Registration forgets the email right away in this process; other processes
+# may still reject it for up to UNKNOWN_EMAIL_TTL seconds.
+#
+# The store is RATE_LIMIT_STORE (import path of a class taking maxsize with
+# the MemoryRateLimitStore methods). The default is per process; with several
+# worker processes, a shared store (e.g. Redis sorted sets) makes the limits
+# global instead of per process.
+
+
+class MemoryRateLimitStore:
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._hits = OrderedDict()  # key -> deque of timestamps, oldest first
+        self._lock = threading.Lock()
+
+    # Timestamps of key's hits after since (older ones are dropped)
+    def hits(self, key, since):
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                return []
+            while hits and hits[0] <= since:
+                hits.popleft()
+            if not hits:
+                del self._hits[key]
+                return []
+            return list(hits)
+
+    # window: how long the hit matters (a shared store can expire the key)
+    def add(self, key, timestamp, window):
+        with self._lock:
+            self._hits.setdefault(key, deque()).append(timestamp)
+            self._hits.move_to_end(key)
+            while len(self._hits) > self.maxsize:
+                self._hits.popitem(last=False)
+
+    def clear(self, key):
+        with self._lock:
+            self._hits.pop(key, None)
+
+
+class SlidingWindowLimiter:
+    def __init__(self, store, prefix, limit, window):
+        self.store = store
+        self.prefix = prefix
+        self.limit = limit
+        self.window = window
+
+    # Seconds until key may try again, or None if it is under the limit
+    def retry_after(self, key):
+        now = time.time()
+        hits = self.store.hits((self.prefix, key), now - self.window)
+        if len(hits) < self.limit:
+            return None
+        return max(hits[-self.limit] + self.window - now, 1)
+
+    def hit(self, key):
+        self.store.add((self.prefix, key), time.time(), self.window)
+
+    def reset(self, key):
+        self.store.clear((self.prefix, key))
+
+
+def init_rate_limits(app):
+    store = import_string(app.config.get('RATE_LIMIT_STORE', 'ratelimit.MemoryRateLimitStore'))()
+    window = app.config.get('LOGIN_LIMIT_WINDOW', 300)
+    unknown_backend = import_string(app.config.get('UNKNOWN_EMAIL_BACKEND', 'cache.TTLCache'))
+    app.extensions['login_limits'] = {
+        'ip': SlidingWindowLimiter(store, 'login_ip', app.config.get('LOGIN_LIMIT_PER_IP', 30), window),
+        'email': SlidingWindowLimiter(store, 'login_email', app.config.get('LOGIN_LIMIT_PER_EMAIL', 5), window),
+        'unknown_emails': unknown_backend(maxsize=app.config.get('UNKNOWN_EMAIL_CACHE_SIZE', 10000),
+                                          ttl=app.config.get('UNKNOWN_EMAIL_TTL', 60)),
+    }
+
+
+def login_limits():
+    return current_app.extensions['login_limits']
+
+
+def email_key(email):
+    return (email or '').strip().lower()
+
+
+# Returns seconds to wait if the IP or the email is over its limit;
+# otherwise records the attempt for the IP and returns None
+def check_login_attempt(ip, email):
+    limits = login_limits()
+    waits = [limits['ip'].retry_after(ip), limits['email'].retry_after(email_key(email))]
+    waits = [wait for wait in waits if wait is not None]
+    if waits:
+        return int(max(waits)) + 1
+    limits['ip'].hit(ip)
+    return None
+
+
+def login_failed(email):
+    login_limits()['email'].hit(email_key(email))
+
+
+def login_succeeded(email):
+    login_limits()['email'].reset(email_key(email))
+
+
+# ---------------------- Unknown Emails ----------------------
+# Keyed by the email exactly as looked up (the email columns are compared
+# as-is), not by email_key
+def is_unknown_email(email):
+    return login_limits()['unknown_emails'].get(email) is not None
+
+
+def remember_unknown_email(email):
+    login_limits()['unknown_emails'].set(email, True)
+
+
+def forget_unknown_email(email):
+    login_limits()['unknown_emails'].delete(email)
@@ -1,11 +1,23 @@
 document.addEventListener('DOMContentLoaded', () => {
-    const pages = document.querySelectorAll('.page');
+    const book = document.querySelector('.book');
+    if (!book) return;
+
+    // Pages are added while flipping, kaya array ito at hindi static NodeList
+    let pages = Array.from(book.querySelectorAll('.page'));
     const bookWrapper = document.querySelector('.book-wrapper');
     const leftZone = document.querySelector('.left-zone');
     const rightZone = document.querySelector('.right-zone');
     const searchInput = document.querySelector('#breedSearch');
     const flipSound = document.getElementById('flipSound');
 
+    // Windowed flipbook: more pages come from data-pages-url after data-next-cursor
+    const pagesUrl = book.dataset.pagesUrl;
+    let nextCursor = book.dataset.nextCursor || null;
+    let loadingPages = null;
+    let searchTerm = "";
+    let searchRequest = 0;
+    const PRELOAD_AHEAD = 3; // fetch more when this close to the last loaded page
+
     function playFlipSound() {
         if (flipSound) {
             flipSound.currentTime = 0;
@@ -14,9 +26,52 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     let currentPageIndex = 0;
-    const totalPages = pages.length;
+
+    // Images of pages further ahead only have data-src until needed
+    function loadImages(page) {
+        if (!page) return;
+        page.querySelectorAll('img[data-src]').forEach(img => {
+            img.src = img.dataset.src;
+            img.removeAttribute('data-src');
+        });
+    }
+
+    // Current page plus the next one, so the image is ready before the flip
+    function preloadAround(index) {
+        for (let i = index; i <= index + 2 && i < pages.length; i++) {
+            loadImages(pages[i]);
+        }
+    }
+
+    function loadMorePages() {
+        if (!pagesUrl || !nextCursor) return Promise.resolve();
+        if (loadingPages) return loadingPages;
+
+        const url = new URL(pagesUrl, window.location.href);
+        url.searchParams.set('after', nextCursor);
+        if (searchTerm !== "") url.searchParams.set('breed', searchTerm);
+        const requestId = searchRequest;
+        loadingPages = fetch(url, { headers: { 'Accept': 'application/json' } })
+            .then(response => response.ok ? response.json() : Promise.reject(response.status))
+            .then(data => {
+                if (requestId !== searchRequest) return; // the search changed meanwhile
+                const template = document.createElement('template');
+                template.innerHTML = data.html;
+                const newPages = Array.from(template.content.querySelectorAll('.page'));
+                newPages.forEach(page => book.insertBefore(page, leftZone));
+                pages = pages.concat(newPages);
+                nextCursor = data.next_cursor;
+                updateZIndex();
+                updateClickZones();
+                preloadAround(currentPageIndex);
+            })
+            .catch(() => { /* keep the pages we have; next flip will retry */ })
+            .finally(() => { loadingPages = null; });
+        return loadingPages;
+    }
 
     function updateZIndex() {
+        const totalPages = pages.length;
         pages.forEach((page, index) => {
             page.style.zIndex = index >= currentPageIndex ? totalPages - index : index + 1;
         });
@@ -24,98 +79,105 @@ document.addEventListener('DOMContentLoaded', () => {
 
     function updateClickZones() {
         leftZone.style.display = currentPageIndex === 0 ? 'none' : 'block';
-        rightZone.style.display = currentPageIndex >= totalPages - 1 ? 'none' : 'block';
+        rightZone.style.display = currentPageIndex >= pages.length - 1 && !nextCursor ? 'none' : 'block';
     }
 
-    // Navigation, skip filtered pages (animals only)
+    // Navigation
     window.navigateBook = function(direction) {
         let nextIndex = currentPageIndex;
         let oldPageIndex = currentPageIndex; // Store the index before the change
+        const totalPages = pages.length;
 
         if (direction === 'next') {
-            do { nextIndex++; } 
-            while(nextIndex < totalPages && pages[nextIndex].classList.contains('filtered'));
+            nextIndex++;
 
             if (nextIndex < totalPages) {
                 playFlipSound();
-                
+
                 // 1. Give the page a high z-index immediately before flipping
-                pages[oldPageIndex].style.zIndex = totalPages + 1; 
+                pages[oldPageIndex].style.zIndex = totalPages + 1;
                 pages[oldPageIndex].classList.add('flipped');
-                
+
                 currentPageIndex = nextIndex;
-                
+
                 // 2. Schedule the z-index reset *after* the 600ms transition
                 setTimeout(updateZIndex, 650); // Wait 650ms (0.6s transition + buffer)
+            } else if (nextCursor) {
+                // Reached the end of what is loaded: fetch, then flip
+                loadMorePages().then(() => {
+                    if (pages.length > totalPages) window.navigateBook('next');
+                });
+                return;
             }
         } else if (direction === 'prev') {
-            do { nextIndex--; } 
-            while(nextIndex >= 0 && pages[nextIndex].classList.contains('filtered'));
+            nextIndex--;
 
             if (nextIndex >= 0) {
                 playFlipSound();
-                
+
                 currentPageIndex = nextIndex;
-                
+
                 // 1. Remove flipped class and give it a high z-index (for un-flipping)
                 pages[nextIndex].style.zIndex = totalPages + 1;
                 pages[nextIndex].classList.remove('flipped');
-                
+
                 // 2. Schedule the z-index reset *after* the 600ms transition
                 setTimeout(updateZIndex, 650); // Wait 650ms (0.6s transition + buffer)
             }
         }
 
         if (bookWrapper) bookWrapper.classList.toggle('is-open', currentPageIndex > 0);
-        // REMOVED: updateZIndex() call here. It is now handled by setTimeout.
+        preloadAround(currentPageIndex);
+        if (pages.length - currentPageIndex <= PRELOAD_AHEAD) loadMorePages();
         updateClickZones();
     };
 
-    // Search Functionality
-    searchInput.addEventListener('input', () => {
-    const term = searchInput.value.toLowerCase().trim();
-    const animalPages = Array.from(pages).slice(2); // skip cover & welcome page
-
-    // Reset all pages
-    pages.forEach(p => {
-        p.classList.remove('filtered');
-        p.style.display = 'block';
-    });
-
-    // Apply filtering when search is NOT empty
-    if (term !== "") {
-        animalPages.forEach(p => {
-            const breed = p.dataset.breed || "";
-            if (!breed.includes(term)) {
-                p.classList.add('filtered');
-                p.style.display = 'none';
-            }
-        });
+    // Search: the server returns only the matching animals (animal_search.py)
+    let searchTimer = null;
+
+    function searchAnimals(term) {
+        const url = new URL(pagesUrl, window.location.href);
+        if (term !== "") url.searchParams.set('breed', term);
+        const requestId = ++searchRequest;
+        searchTerm = term;
+
+        fetch(url, { headers: { 'Accept': 'application/json' } })
+            .then(response => response.ok ? response.json() : Promise.reject(response.status))
+            .then(data => {
+                if (requestId !== searchRequest) return; // a newer search already started
+
+                // Replace the animal pages and the first animal's details
+                pages.slice(2).forEach(page => page.remove());
+                const template = document.createElement('template');
+                template.innerHTML = data.html;
+                const newPages = Array.from(template.content.querySelectorAll('.page'));
+                newPages.forEach(page => book.insertBefore(page, leftZone));
+
+                const welcomeBack = pages[1] && pages[1].querySelector('.back');
+                if (welcomeBack && data.first_html) welcomeBack.outerHTML = data.first_html;
+
+                pages = pages.slice(0, 2).concat(newPages);
+                nextCursor = data.next_cursor;
+
+                // Back to the cover
+                pages.forEach(p => p.classList.remove('flipped'));
+                currentPageIndex = 0;
+                if (bookWrapper) bookWrapper.classList.remove('is-open');
+                updateZIndex();
+                updateClickZones();
+                preloadAround(0);
+            })
+            .catch(() => { /* keep the current pages */ });
     }
 
-    // Rebuild visible pages list for correct flipping
-    const visiblePages = Array.from(pages).filter(p => p.style.display !== 'none');
-
-    // Reset page states
-    pages.forEach(p => p.classList.remove('flipped'));
-
-    currentPageIndex = 0;
-
-    // Reassign z-index based only on visible pages
-    visiblePages.forEach((page, i) => {
-        page.style.zIndex = visiblePages.length - i;
+    if (searchInput && pagesUrl) searchInput.addEventListener('input', () => {
+        clearTimeout(searchTimer);
+        const term = searchInput.value.toLowerCase().trim();
+        searchTimer = setTimeout(() => searchAnimals(term), 250);
     });
 
-    // Update open/close state
-    if (bookWrapper) bookWrapper.classList.remove('is-open');
-
-    // Update click zones
-    updateClickZones();
-});
-
-
     // Initial Setup
     updateZIndex();
     updateClickZones();
+    preloadAround(0);
 });
-
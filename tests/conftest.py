@@ -0,0 +1,95 @@
+import os
+import sys
+import tempfile
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+# The app reads its configuration when app.py is imported, kaya ang test
+# database at cheap password hashing ay naka-set bago ang import
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+TEST_DIR = tempfile.mkdtemp(prefix='pawssion-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(TEST_DIR, 'test.db')
+os.environ['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1'
+os.environ.pop('PAWSSION_CONFIG', None)
+
+from app import app as flask_app  # noqa: E402
+from models import db  # noqa: E402
+from migrations import upgrade_database  # noqa: E402
+from versions import version_cache  # noqa: E402
+from notification_service import unread_cache, admin_cache  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    # Uploads and their cleanup go to a temp folder, never static/images
+    upload_folder = os.path.join(TEST_DIR, 'images')
+    os.makedirs(upload_folder, exist_ok=True)
+    flask_app.config.update(TESTING=True, WTF_CSRF_ENABLED=False, JOBS_INLINE=True, UPLOAD_FOLDER=upload_folder)
+    with flask_app.app_context():
+        db.create_all()
+        upgrade_database()
+    # No app context stays pushed: each test request gets its own (own db.session)
+    return flask_app
+
+
+# A second, empty database at the current schema for tests that need their
+# own ids (seed.sql); yields an app whose context is pushed
+@pytest.fixture
+def fresh_app(tmp_path):
+    fresh = Flask(__name__)
+    fresh.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + str(tmp_path / 'fresh.db')
+    db.init_app(fresh)
+    with fresh.app_context():
+        db.create_all()
+        upgrade_database()
+        yield fresh
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture(scope='session')
+def client(app):
+    return app.test_client()
+
+
+# Every in-process cache, so a measured request does all of its own queries
+def clear_caches(app):
+    app.extensions['page_cache'].clear()
+    version_cache.clear()
+    unread_cache.clear()
+    admin_cache.clear()
+
+
+# Logs the test client in as role/principal_id without going through /login
+def login(client, role, principal_id):
+    with client.session_transaction() as session:
+        session.clear()
+        session['role'] = role
+        session['user_id'] = principal_id
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+        self.statements = []
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+
+@pytest.fixture(scope='session')
+def count_queries(app):
+    with app.app_context():
+        engine = db.engine
+    return lambda: QueryCounter(engine)
@@ -0,0 +1,134 @@
+import io
+from datetime import datetime, timedelta
+from PIL import Image
+from werkzeug.security import generate_password_hash
+from models import db, User, Shelter, Animal, AdoptionRequest, Notification
+from catalog import rebuild_catalog
+
+# ---------------------- Generated Test Data ----------------------
+# populate(shelters, animals, requests) tops the database up to:
+#   - `shelters` approved shelters (plus one pending), each with `animals`
+#     animals; the first animal of each shelter is adopted by user1
+#   - `requests` users; every available animal has a pending request from
+#     user1..user<requests>
+#   - notifications for every account, growing with the same numbers
+# Calling it again with bigger numbers only inserts the missing rows, kaya
+# the same accounts and animals simply get more data around them.
+# Rows are written with bulk INSERTs (no per-row ORM work).
+
+PASSWORD = 'password123'
+PASSWORD_HASH = generate_password_hash(PASSWORD, 'pbkdf2:sha256:1')  # cheap on purpose
+ANIMAL_TYPES = ['Dog', 'Cat']
+BREEDS = ['Aspin', 'Puspin', 'Labrador', 'Shih Tzu', 'Persian', 'Siamese']
+
+
+def insert(model, rows):
+    if rows:
+        db.session.execute(db.insert(model), rows)
+
+
+def ensure_users(count):
+    existing = {name for (name,) in db.session.query(User.username)}
+    rows = []
+    if 'admin' not in existing:
+        rows.append({'username': 'admin', 'email': 'admin@pawssion.com', 'password': PASSWORD_HASH,
+                     'role': 'admin'})
+    for i in range(1, count + 1):
+        if f'user{i}' not in existing:
+            rows.append({'username': f'user{i}', 'email': f'user{i}@example.com', 'password': PASSWORD_HASH,
+                         'role': 'user', 'first_name': f'User{i}', 'last_name': 'Test', 'age': 20 + i % 40,
+                         'gender': 'Female' if i % 2 else 'Male', 'address': f'{i} Mabini St',
+                         'contact': '09123456789'})
+    insert(User, rows)
+    users = db.session.query(User.id).filter(User.role == 'user').order_by(User.id).limit(count)
+    return [user_id for (user_id,) in users]
+
+
+def shelter_row(i, approved):
+    return {'name': f'Shelter {i}', 'description': f'Shelter number {i}', 'address': f'{i} Rizal Ave',
+            'contact_number': '09123456789', 'email': f'shelter{i}@example.com',
+            'date_established': '01/2000', 'shelter_type': 'Private', 'approved': approved,
+            'password': PASSWORD_HASH}
+
+
+def ensure_shelters(count):
+    existing = {email for (email,) in db.session.query(Shelter.email)}
+    rows = [shelter_row(i, True) for i in range(1, count + 1) if f'shelter{i}@example.com' not in existing]
+    if 'pending@example.com' not in existing:
+        rows.append(dict(shelter_row(0, None), email='pending@example.com', name='Pending Shelter'))
+    insert(Shelter, rows)
+    shelters = db.session.query(Shelter.id).filter(Shelter.approved.is_(True)).order_by(Shelter.id).limit(count)
+    return [shelter_id for (shelter_id,) in shelters]
+
+
+def ensure_animals(shelter_ids, count, adopter_id):
+    have = dict(db.session.query(Animal.shelter_id, db.func.count())
+                          .filter(Animal.shelter_id.in_(shelter_ids)).group_by(Animal.shelter_id))
+    rows = []
+    for shelter_id in shelter_ids:
+        for i in range(have.get(shelter_id, 0), count):
+            adopted = i == 0
+            rows.append({'name': f'Pet {shelter_id}-{i}', 'age': str(i % 15), 'breed': BREEDS[i % len(BREEDS)],
+                         'gender': 'Male' if i % 2 else 'Female', 'type': ANIMAL_TYPES[i % 2],
+                         'description': f'Friendly pet number {i}', 'image1': 'images/placeholder.jpg',
+                         'shelter_id': shelter_id, 'status': 'Adopted' if adopted else 'Available',
+                         'adopter_id': adopter_id if adopted else None})
+    insert(Animal, rows)
+
+
+def ensure_requests(user_ids, count):
+    have = set(db.session.query(AdoptionRequest.animal_id, AdoptionRequest.user_id))
+    animals = db.session.query(Animal.id, Animal.status, Animal.adopter_id).all()
+    now = datetime.now()
+    rows = []
+    for animal_id, status, adopter_id in animals:
+        for i, user_id in enumerate(user_ids[:count]):
+            if (animal_id, user_id) in have:
+                continue
+            if status == 'Adopted':
+                request_status = 'approved' if user_id == adopter_id else 'canceled'
+            else:
+                request_status = 'pending'
+            rows.append({'reason': 'I have a big yard.', 'status': request_status, 'user_id': user_id,
+                         'animal_id': animal_id, 'timestamp': now - timedelta(minutes=i)})
+    insert(AdoptionRequest, rows)
+
+
+def ensure_notifications(user_ids, shelter_ids, count):
+    have_users = dict(db.session.query(Notification.user_id, db.func.count())
+                                .filter(Notification.user_id.isnot(None)).group_by(Notification.user_id))
+    have_shelters = dict(db.session.query(Notification.shelter_id, db.func.count())
+                                   .filter(Notification.shelter_id.isnot(None)).group_by(Notification.shelter_id))
+    now = datetime.now()
+    rows = []
+    for column, ids, have in (('user_id', user_ids, have_users), ('shelter_id', shelter_ids, have_shelters)):
+        for principal_id in ids:
+            for i in range(have.get(principal_id, 0), count):
+                rows.append({'message': f'Notification {i}', 'timestamp': now - timedelta(seconds=i),
+                             'read': i % 3 == 0, column: principal_id,
+                             'shelter_id' if column == 'user_id' else 'user_id': None})
+    insert(Notification, rows)
+
+
+def populate(shelters, animals, requests):
+    user_ids = ensure_users(requests)
+    admin_id = db.session.query(User.id).filter_by(role='admin').scalar()
+    shelter_ids = ensure_shelters(shelters)
+    ensure_animals(shelter_ids, animals, adopter_id=user_ids[0])
+    ensure_requests(user_ids, requests)
+    ensure_notifications(user_ids + [admin_id], shelter_ids, animals * requests)
+    db.session.commit()
+    rebuild_catalog()  # bulk inserts skip the ORM listeners that keep it current
+
+
+# ---------------------- Generated Uploads ----------------------
+# A small solid-color PNG and the /post_animal (/edit_animal) form around it
+def png(size=(600, 400), color='orange', mode='RGB'):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def animal_form(image, name='Upload Pet', description='Posted with a photo'):
+    return {'name': name, 'age': '2', 'type': 'Dog', 'breed': 'Aspin', 'gender': 'Male',
+            'description': description, 'image1': (io.BytesIO(image), 'photo.png')}
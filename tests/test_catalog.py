@@ -0,0 +1,64 @@
+import pytest
+from models import db, User, Shelter, Animal, AdoptionRequest
+from conftest import login
+from dataset import populate, png, animal_form
+from cascades import delete_animal_cascade
+
+# ---------------------- Adoption Catalog ----------------------
+# /browse lists catalog_entry rows. Posting, editing, adopting and deleting
+# through the routes must refresh the entry in the same commit.
+
+
+@pytest.fixture
+def accounts(app, client):
+    with app.app_context():
+        populate(2, 4, 2)
+        shelter_id = db.session.query(db.func.min(Shelter.id)).filter(Shelter.approved.is_(True)).scalar()
+        user_id = db.session.query(User.id).filter_by(username='user1').scalar()
+        first_animal = db.session.query(db.func.max(Animal.id)).scalar()
+    yield shelter_id, user_id
+    with app.app_context():
+        for animal in Animal.query.filter(Animal.id > first_animal):
+            delete_animal_cascade(animal)
+        db.session.commit()
+
+
+def post_animal(app, client, shelter_id, name):
+    login(client, 'shelter', shelter_id)
+    client.post('/post_animal', data=animal_form(png(), name), content_type='multipart/form-data')
+    with app.app_context():
+        return db.session.query(Animal.id).filter_by(name=name).scalar()
+
+
+def browse(client, user_id):
+    login(client, 'user', user_id)
+    return client.get('/browse').get_data(as_text=True)
+
+
+def test_browse_follows_animal_changes(app, client, accounts):
+    shelter_id, user_id = accounts
+    adopted = post_animal(app, client, shelter_id, 'Axolotl')
+    deleted = post_animal(app, client, shelter_id, 'Okapi')
+    page = browse(client, user_id)
+    assert 'Axolotl' in page and 'Okapi' in page
+
+    login(client, 'shelter', shelter_id)
+    client.post(f'/edit_animal/{adopted}', data=animal_form(png(), 'Narwhal'), content_type='multipart/form-data')
+    page = browse(client, user_id)
+    assert 'Narwhal' in page and 'Axolotl' not in page
+
+    # user1 asks for it and the shelter approves
+    client.post(f'/adopt/{adopted}', data={'reason': 'Big yard'})
+    with app.app_context():
+        request_id = db.session.query(AdoptionRequest.id).filter_by(animal_id=adopted, user_id=user_id).scalar()
+    login(client, 'shelter', shelter_id)
+    client.post(f'/shelter/approve_adoption/{request_id}')
+    assert 'Narwhal' not in browse(client, user_id)
+
+    login(client, 'shelter', shelter_id)
+    client.get(f'/delete_animal/{deleted}')
+    page = browse(client, user_id)
+    assert 'Okapi' not in page
+    with app.app_context():
+        assert db.session.get(Animal, adopted).status == 'Adopted'
+        assert db.session.get(Animal, deleted) is None
@@ -0,0 +1,60 @@
+import pytest
+from models import db, User, Shelter, Animal
+from conftest import login
+from dataset import populate, png, animal_form
+from cascades import delete_animal_cascade
+
+# ---------------------- Full-text Search ----------------------
+# /api/search reads the FTS5 tables (PostgreSQL: expression indexes), which
+# the triggers keep in sync with every insert, update and delete of animals
+# made by the shelter routes. Animal names here are words populate() never
+# uses, so only these animals match.
+
+
+@pytest.fixture
+def accounts(app, client):
+    with app.app_context():
+        populate(2, 4, 2)
+        shelter_id = db.session.query(db.func.min(Shelter.id)).filter(Shelter.approved.is_(True)).scalar()
+        user_id = db.session.query(User.id).filter_by(username='user1').scalar()
+        first_animal = db.session.query(db.func.max(Animal.id)).scalar()
+    yield shelter_id, user_id
+    with app.app_context():
+        for animal in Animal.query.filter(Animal.id > first_animal):
+            delete_animal_cascade(animal)
+        db.session.commit()
+
+
+def post_animal(app, client, shelter_id, name, description='Posted with a photo'):
+    login(client, 'shelter', shelter_id)
+    client.post('/post_animal', data=animal_form(png(), name, description), content_type='multipart/form-data')
+    with app.app_context():
+        return db.session.query(Animal.id).filter_by(name=name).scalar()
+
+
+def search(client, user_id, q):
+    login(client, 'user', user_id)
+    return [(r['id'], r['name']) for r in client.get('/api/search', query_string={'q': q}).get_json()['results']
+            if r['kind'] == 'animal']
+
+
+def test_search_follows_edits_and_deletes(app, client, accounts):
+    shelter_id, user_id = accounts
+    animal_id = post_animal(app, client, shelter_id, 'Quokka')
+    assert search(client, user_id, 'quokka') == [(animal_id, 'Quokka')]
+
+    login(client, 'shelter', shelter_id)
+    client.post(f'/edit_animal/{animal_id}', data=animal_form(png(), 'Wombat'), content_type='multipart/form-data')
+    assert search(client, user_id, 'quokka') == []
+    assert search(client, user_id, 'wombat') == [(animal_id, 'Wombat')]
+
+    login(client, 'shelter', shelter_id)
+    client.get(f'/delete_animal/{animal_id}')
+    assert search(client, user_id, 'wombat') == []
+
+
+def test_name_outranks_description(app, client, accounts):
+    shelter_id, user_id = accounts
+    described = post_animal(app, client, shelter_id, 'Biscuit', description='Shy, loves the pangolin plushie')
+    named = post_animal(app, client, shelter_id, 'Pangolin')
+    assert search(client, user_id, 'pangolin') == [(named, 'Pangolin'), (described, 'Biscuit')]
@@ -0,0 +1,99 @@
+import os
+import pytest
+from PIL import Image
+from models import db, Shelter, Animal
+from conftest import login
+from dataset import populate, png, animal_form
+from images import IMAGE_SIZES, image_files, variant_name, release_images
+
+# ---------------------- Image Uploads ----------------------
+# Uploads go through POST /post_animal and /edit_animal like in the browser,
+# with small generated images; the files land in the temp UPLOAD_FOLDER.
+
+
+@pytest.fixture
+def shelter(app, client):
+    with app.app_context():
+        populate(2, 4, 2)
+        shelter_id = db.session.query(db.func.min(Shelter.id)).filter(Shelter.approved.is_(True)).scalar()
+    login(client, 'shelter', shelter_id)
+    yield shelter_id
+    # Remove the animals these tests posted
+    with app.app_context():
+        posted = [animal_id for (animal_id,) in db.session.query(Animal.id).filter(Animal.name.like('Upload Pet%'))]
+    for animal_id in posted:
+        client.get(f'/delete_animal/{animal_id}')
+
+
+def post_animal(app, client, image, name='Upload Pet'):
+    response = client.post('/post_animal', data=animal_form(image, name), content_type='multipart/form-data')
+    with app.app_context():
+        animal = Animal.query.filter_by(name=name).order_by(Animal.id.desc()).first()
+        return response, animal and (animal.id, animal.image1)
+
+
+def stored(app, filename):
+    return {name for name in image_files(filename) if os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], name))}
+
+
+def test_upload_is_saved_as_webp_variants(app, client, shelter):
+    response, (animal_id, filename) = post_animal(app, client, png())
+    assert response.status_code == 302
+    assert filename.endswith('.webp')
+
+    assert stored(app, filename) == image_files(filename)
+    for size, pixels in IMAGE_SIZES.items():
+        with Image.open(os.path.join(app.config['UPLOAD_FOLDER'], variant_name(filename, size))) as image:
+            assert image.format == 'WEBP'
+            assert max(image.size) == min(pixels, 600)
+
+
+def test_decompression_bomb_is_rejected(app, client, shelter):
+    # A few KB on disk, 64 megapixels once decoded
+    bomb = png(size=(8000, 8000), color=0, mode='1')
+    assert len(bomb) < 1_000_000
+    before = set(os.listdir(app.config['UPLOAD_FOLDER']))
+
+    response, animal = post_animal(app, client, bomb, name='Upload Pet Bomb')
+    assert response.status_code == 302 and response.headers['Location'].endswith('/post_animal')
+    assert animal is None
+    with client.session_transaction() as session:
+        assert ('message', 'The uploaded file is not a valid image.') in session['_flashes']
+    assert set(os.listdir(app.config['UPLOAD_FOLDER'])) == before
+
+
+def test_same_photo_is_stored_once(app, client, shelter):
+    photo = png(color='teal')
+    _, (first_id, first) = post_animal(app, client, photo, name='Upload Pet 1')
+    _, (second_id, second) = post_animal(app, client, photo, name='Upload Pet 2')
+    assert first == second
+    assert stored(app, first) == image_files(first)
+
+    # Files are removed with the last animal that uses them
+    client.get(f'/delete_animal/{first_id}')
+    assert stored(app, first) == image_files(first)
+    client.get(f'/delete_animal/{second_id}')
+    assert stored(app, first) == set()
+
+
+def test_edit_releases_the_old_photo(app, client, shelter):
+    _, (animal_id, old) = post_animal(app, client, png(color='navy'))
+    response = client.post(f'/edit_animal/{animal_id}', data=animal_form(png(color='olive')),
+                           content_type='multipart/form-data')
+    assert response.status_code == 302
+    with app.app_context():
+        new = db.session.get(Animal, animal_id).image1
+    assert new != old
+    assert stored(app, new) == image_files(new)
+    assert stored(app, old) == set()
+
+
+def test_release_waits_for_commit(app, client, shelter):
+    _, (animal_id, filename) = post_animal(app, client, png(color='maroon'))
+    with app.app_context():
+        animal = db.session.get(Animal, animal_id)
+        animal.image1 = 'images/placeholder.jpg'
+        release_images([filename])
+        assert stored(app, filename) == image_files(filename)
+        db.session.rollback()
+    assert stored(app, filename) == image_files(filename)
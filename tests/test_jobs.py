@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+import pytest
+import jobs
+from models import db, User, Shelter, Animal, Job
+from conftest import login
+from dataset import populate, insert, shelter_row
+from jobs import job_handler, enqueue, run_job, requeue_stale_jobs
+
+# ---------------------- Job Queue ----------------------
+# run_job() claims a job with a conditional UPDATE, retries failures with a
+# growing delay until max_attempts, and requeue_stale_jobs() recovers jobs a
+# crashed worker left 'running'. Jobs are run directly here, not by the
+# worker thread.
+
+calls = []
+
+
+@job_handler('test_flaky')
+def flaky(fail):
+    calls.append(fail)
+    if fail:
+        raise RuntimeError('handler failed')
+
+
+@pytest.fixture
+def app_context(app):
+    calls.clear()
+    with app.app_context():
+        yield
+        db.session.execute(db.delete(Job).where(Job.kind == 'test_flaky'))
+        db.session.commit()
+
+
+def new_job(fail, max_attempts=3, **columns):
+    job = enqueue('test_flaky', max_attempts=max_attempts, fail=fail)
+    for name, value in columns.items():
+        setattr(job, name, value)
+    db.session.commit()
+    return job.id
+
+
+def test_failing_job_is_retried_then_failed(app_context):
+    job_id = new_job(fail=True, max_attempts=2)
+
+    before = datetime.now()
+    assert run_job(job_id)
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.attempts) == ('queued', 1)
+    assert 'handler failed' in job.error
+    assert job.run_after >= before + timedelta(seconds=jobs.RETRY_DELAY)
+
+    # Not due yet: the retry waits for run_after
+    assert not run_job(job_id)
+    assert calls == [True]
+
+    job.run_after = datetime.now()
+    db.session.commit()
+    assert run_job(job_id)
+    db.session.refresh(job)
+    assert (job.status, job.attempts) == ('failed', 2)
+    assert calls == [True, True]
+
+
+def test_successful_job_is_done(app_context):
+    job_id = new_job(fail=False)
+    assert run_job(job_id)
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.attempts, job.error) == ('done', 1, None)
+    # A finished job is never claimed again
+    assert not run_job(job_id)
+    assert calls == [False]
+
+
+def test_running_job_is_not_claimed_twice(app_context):
+    job_id = new_job(fail=False, status='running', attempts=1)
+    assert not run_job(job_id)
+    job = db.session.get(Job, job_id)
+    assert (job.status, job.attempts) == ('running', 1)
+    assert calls == []
+
+
+def test_stale_running_job_is_requeued(app_context):
+    old = datetime.now() - jobs.STALE_AFTER - timedelta(minutes=1)
+    stale_id = new_job(fail=False, status='running', attempts=1, updated_at=old)
+    fresh_id = new_job(fail=False, status='running', attempts=1, updated_at=datetime.now())
+
+    requeue_stale_jobs()
+    assert db.session.get(Job, stale_id).status == 'queued'
+    assert db.session.get(Job, fresh_id).status == 'running'
+
+    assert run_job(stale_id)
+    job = db.session.get(Job, stale_id)
+    assert (job.status, job.attempts) == ('done', 2)
+
+
+def test_delete_shelter_returns_job_status(app, client):
+    with app.app_context():
+        populate(2, 4, 2)
+        insert(Shelter, [dict(shelter_row(0, True), email='doomed@example.com', name='Doomed Shelter')])
+        shelter_id = db.session.query(Shelter.id).filter_by(email='doomed@example.com').scalar()
+        insert(Animal, [{'name': 'Doomed Pet', 'age': '2', 'breed': 'Aspin', 'gender': 'Male', 'type': 'Dog',
+                         'description': 'Friendly', 'image1': 'images/placeholder.jpg', 'shelter_id': shelter_id}])
+        db.session.commit()
+        admin_id = db.session.query(User.id).filter_by(role='admin').scalar()
+
+    login(client, 'admin', admin_id)
+    response = client.post(f'/admin/delete_shelter/{shelter_id}', headers={'Accept': 'application/json'})
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body['status_url'] == f"/admin/jobs/{body['job_id']}"
+
+    # JOBS_INLINE: the cascade has already run
+    status = client.get(body['status_url']).get_json()
+    assert (status['kind'], status['status'], status['attempts']) == ('delete_shelter', 'done', 1)
+    with app.app_context():
+        assert db.session.get(Shelter, shelter_id) is None
+        assert not Animal.query.filter_by(shelter_id=shelter_id).count()
@@ -0,0 +1,37 @@
+from models import db, User, Animal
+from conftest import login
+from dataset import populate
+
+# ---------------------- Adopter Names ----------------------
+# The shelter dashboard flipbook shows "Adopted by: <first> <last>". That
+# text comes from the cached flipbook window (page_cache.py) and is covered
+# by the dashboard's ETag (versions.py); both have to change when the
+# adopter renames themselves.
+
+
+def test_adopter_rename_refreshes_shelter_pages(app, client):
+    with app.app_context():
+        populate(2, 4, 2)
+        user = User.query.filter_by(username='user1').one()
+        profile = {'first_name': 'Renamed', 'last_name': 'Adopter', 'username': user.username,
+                   'email': user.email}
+        old_name = f'{user.first_name} {user.last_name}'.encode()
+        # populate() makes user1 the adopter of the first animal of every shelter
+        shelter_id = db.session.query(db.func.min(Animal.shelter_id)).filter(Animal.adopter_id == user.id).scalar()
+        user_id = user.id
+
+    login(client, 'shelter', shelter_id)
+    before = client.get('/shelter_dashboard')
+    assert old_name in before.data
+
+    login(client, 'user', user_id)
+    assert client.post('/profile', data=profile).status_code == 302
+
+    login(client, 'shelter', shelter_id)
+    after = client.get('/shelter_dashboard', headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert b'Renamed Adopter' in after.data
+
+    # Put the name back for the other tests
+    login(client, 'user', user_id)
+    client.post('/profile', data=dict(profile, first_name='User1', last_name='Test'))
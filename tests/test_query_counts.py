@@ -0,0 +1,201 @@
+import os
+from collections import namedtuple
+import pytest
+from models import db, User, Shelter, Animal, AdoptionRequest, Job
+from conftest import clear_caches
+from dataset import populate, shelter_row, PASSWORD
+
+# ---------------------- Query Count Regression ----------------------
+# Every route runs against a small generated dataset, then again after the
+# same database is grown (more shelters, animals per shelter, requests per
+# animal, notifications per account). A route fails if it issues more SQL
+# statements on the bigger dataset (an N+1 came back) or more than its
+# bound. Caches are cleared before each request, so these are cold counts.
+# The bounds are today's counts: lower one when a route gets cheaper.
+#
+# Sizes are "shelters x animals x requests", e.g.
+#   QUERY_COUNT_SIZES=3x5x2,20x60x8 python -m pytest tests/test_query_counts.py
+
+SIZES = [tuple(int(n) for n in size.split('x'))
+         for size in os.environ.get('QUERY_COUNT_SIZES', '2x4x2,6x16x5').split(',')]
+# The write routes use up a few pending requests and animals per run
+assert all(shelters >= 2 and animals >= 4 and requests >= 2 for shelters, animals, requests in SIZES), \
+    "QUERY_COUNT_SIZES: need at least 2 shelters x 4 animals x 2 requests"
+
+# Not covered: /logout (no queries), POST /post_animal and /edit_animal
+# (image uploads), and /view_animal (its animal_detail.html template does
+# not exist; nothing links to it).
+#
+# role: session role ('user', 'shelter', 'admin' or None); target() returns
+# the URL (and form data for POSTs), preparing rows outside the count
+Route = namedtuple('Route', 'name role method target max_queries')
+
+
+# ---------------------- Targets ----------------------
+def first_shelter():
+    return db.session.query(db.func.min(Shelter.id)).filter(Shelter.approved.is_(True)).scalar()
+
+
+def user_id(name='user1'):
+    return db.session.query(User.id).filter_by(username=name).scalar()
+
+
+def admin_id():
+    return db.session.query(User.id).filter_by(role='admin').scalar()
+
+
+def shelter_request(shelter_id, status):
+    return db.session.query(db.func.min(AdoptionRequest.id)).join(Animal)\
+                     .filter(Animal.shelter_id == shelter_id, AdoptionRequest.status == status).scalar()
+
+
+def available_animal(shelter_id, last=False):
+    order = db.func.max if last else db.func.min
+    return db.session.query(order(Animal.id)).filter(Animal.shelter_id == shelter_id,
+                                                     Animal.status == 'Available').scalar()
+
+
+def new_pending_shelter():
+    number = db.session.query(db.func.count(Shelter.id)).scalar() + 1000
+    db.session.execute(db.insert(Shelter), [dict(shelter_row(number, None), email=f'new{number}@example.com')])
+    db.session.commit()
+    return db.session.query(db.func.max(Shelter.id)).scalar()
+
+
+# user1 has asked for every animal; free one up so /adopt can take a new request
+def animal_without_request():
+    animal_id = available_animal(first_shelter(), last=True)
+    db.session.execute(db.delete(AdoptionRequest).where(AdoptionRequest.animal_id == animal_id,
+                                                        AdoptionRequest.user_id == user_id()))
+    db.session.commit()
+    return animal_id
+
+
+def last_shelter():
+    return db.session.query(db.func.max(Shelter.id)).filter(Shelter.approved.is_(True)).scalar()
+
+
+# user1's oldest pending request
+def user_request():
+    return db.session.query(db.func.min(AdoptionRequest.id))\
+                     .filter_by(user_id=user_id(), status='pending').scalar()
+
+
+registrations = iter(range(1, 10000))
+
+
+def registration():
+    number = next(registrations)
+    return '/register', {'first_name': 'New', 'last_name': 'User', 'username': f'newuser{number}',
+                         'email': f'newuser{number}@example.com', 'password': PASSWORD,
+                         'confirm_password': PASSWORD}
+
+
+ROUTES = [
+    # Public / accounts
+    Route('index', None, 'get', lambda: '/', 0),
+    Route('login_form', None, 'get', lambda: '/login', 0),
+    Route('login', None, 'post', lambda: ('/login', {'email': 'user1@example.com', 'password': PASSWORD}), 1),
+    Route('register', None, 'post', registration, 5),
+    # User pages
+    Route('user_dashboard', 'user', 'get', lambda: '/user_dashboard', 4),
+    Route('profile', 'user', 'get', lambda: '/profile', 1),
+    Route('notifications', 'user', 'get', lambda: '/notifications', 3),
+    Route('shelter_list', 'user', 'get', lambda: '/shelter_list', 2),
+    Route('browse', 'user', 'get', lambda: '/browse', 1),
+    Route('view_shelter_type', 'user', 'get', lambda: f'/view_shelter/{first_shelter()}/dog', 5),
+    Route('view_shelter_type_pages', 'user', 'get',
+          lambda: f'/view_shelter/{first_shelter()}/dog/pages', 3),
+    Route('api_animals', 'user', 'get', lambda: f'/api/animals?shelter_id={first_shelter()}&type=dog', 2),
+    Route('api_search', 'user', 'get', lambda: '/api/search?q=pet', 2),
+    Route('my_adoption_requests', 'user', 'get', lambda: '/my_adoption_requests', 1),
+    Route('view_adoption_request', 'user', 'get',
+          lambda: f'/adoption_request/{user_request()}', 2),
+    Route('adopt_form', 'user', 'get', lambda: f'/adopt/{animal_without_request()}', 3),
+    Route('adopt', 'user', 'post', lambda: (f'/adopt/{animal_without_request()}', {'reason': 'Big yard'}), 7),
+    Route('cancel_adoption_request', 'user', 'post',
+          lambda: (f'/cancel_adoption_request/{user_request()}', {}), 4),
+    # Shelter pages
+    Route('shelter_dashboard', 'shelter', 'get', lambda: '/shelter_dashboard', 8),
+    Route('shelter_dashboard_pages', 'shelter', 'get', lambda: '/shelter_dashboard/pages', 3),
+    Route('shelter_adoption_requests', 'shelter', 'get', lambda: '/shelter/adoption_requests', 1),
+    Route('shelter_approved_adoptions', 'shelter', 'get', lambda: '/shelter/approved_adoptions', 1),
+    Route('adoption_request_detail', 'shelter', 'get',
+          lambda: f'/shelter/adoption_request/{shelter_request(first_shelter(), "pending")}', 3),
+    Route('shelter_view_approved_adoption', 'shelter', 'get',
+          lambda: f'/shelter/approved_adoption/{shelter_request(first_shelter(), "approved")}', 3),
+    Route('post_animal_form', 'shelter', 'get', lambda: '/post_animal', 0),
+    Route('edit_animal_form', 'shelter', 'get', lambda: f'/edit_animal/{available_animal(first_shelter())}', 1),
+    Route('shelter_reject_adoption', 'shelter', 'post',
+          lambda: (f'/shelter/reject_adoption/{shelter_request(first_shelter(), "pending")}', {}), 6),
+    Route('shelter_approve_adoption', 'shelter', 'post',
+          lambda: (f'/shelter/approve_adoption/{shelter_request(first_shelter(), "pending")}', {}), 11),
+    Route('delete_animal', 'shelter', 'get',
+          lambda: f'/delete_animal/{available_animal(first_shelter(), last=True)}', 8),
+    # Admin pages
+    Route('admin_dashboard', 'admin', 'get', lambda: '/admin_dashboard', 3),
+    Route('admin_approved_shelters', 'admin', 'get', lambda: '/admin/approved_shelters', 1),
+    Route('admin_pending_shelters', 'admin', 'get', lambda: '/admin/pending_shelters', 1),
+    Route('admin_view_shelter', 'admin', 'get', lambda: f'/admin/view_shelter/{first_shelter()}', 1),
+    Route('approve_shelter', 'admin', 'post', lambda: (f'/admin/approve_shelter/{new_pending_shelter()}', {}), 8),
+    Route('reject_shelter', 'admin', 'post', lambda: (f'/admin/reject_shelter/{new_pending_shelter()}', {}), 8),
+    Route('admin_password_hashing', 'admin', 'get', lambda: '/admin/password_hashing', 0),
+    # Last: removes a whole shelter (the job runs inline)
+    Route('delete_shelter', 'admin', 'post', lambda: (f'/admin/delete_shelter/{last_shelter()}', {}), 19),
+    Route('admin_job_status', 'admin', 'get',
+          lambda: f'/admin/jobs/{db.session.query(db.func.max(Job.id)).scalar()}', 1),
+]
+
+
+def principal_id(role):
+    if role == 'user':
+        return user_id()
+    if role == 'shelter':
+        return first_shelter()
+    if role == 'admin':
+        return admin_id()
+    return None
+
+
+def measure(app, client, count_queries, route):
+    with app.app_context():
+        target = route.target()
+        principal = principal_id(route.role)
+    url, data = target if isinstance(target, tuple) else (target, None)
+
+    with client.session_transaction() as session:
+        session.clear()
+        if route.role:
+            session['role'] = route.role
+            session['user_id'] = principal
+    clear_caches(app)
+
+    with count_queries() as counter:
+        if route.method == 'post':
+            response = client.post(url, data=data)
+        else:
+            response = client.get(url)
+    assert response.status_code < 400, f"{route.name}: {url} -> {response.status_code}"
+    return counter
+
+
+@pytest.fixture(scope='module')
+def query_counts(app, client, count_queries):
+    counts = {route.name: [] for route in ROUTES}
+    for size in SIZES:
+        with app.app_context():
+            populate(*size)
+        for route in ROUTES:
+            counts[route.name].append(measure(app, client, count_queries, route))
+    return counts
+
+
+@pytest.mark.parametrize('route', ROUTES, ids=[route.name for route in ROUTES])
+def test_query_count_does_not_grow(query_counts, route):
+    counters = query_counts[route.name]
+    numbers = [counter.count for counter in counters]
+    statements = '\n'.join(counters[-1].statements)
+    assert numbers[-1] <= numbers[0], \
+        f"{route.name}: {numbers} queries for sizes {SIZES}, last run:\n{statements}"
+    assert max(numbers) <= route.max_queries, \
+        f"{route.name}: {numbers} queries, bound {route.max_queries}, last run:\n{statements}"
@@ -0,0 +1,47 @@
+from models import User, Shelter, Animal, AdoptionRequest, Notification, CatalogEntry
+from migrations import load_seed, run_schema_file, normalize_timestamps
+from adoption_status import ADOPTED, AVAILABLE
+from notification_service import feed_query, notification_page
+
+# ---------------------- Seed Data ----------------------
+# database/seed.sql has to load on a database created the way the app does it
+# (create_all + upgrade_database), not only on the old schema_v1.sql.
+
+
+def test_seed_loads_on_current_schema(fresh_app):
+    load_seed()
+
+    assert User.query.count() == 21
+    assert Shelter.query.count() == 20
+    assert Animal.query.count() == 20
+    assert AdoptionRequest.query.count() == 20
+    assert Notification.query.count() == 20
+    assert User.query.filter_by(role='admin').one().email == 'admin@pawssion.com'
+
+    # Status/adopter follow the approved requests, at ang catalog ay
+    # available animals lang
+    approved = {r.animal_id: r.user_id for r in AdoptionRequest.query.filter_by(status='approved')}
+    assert approved
+    for animal in Animal.query:
+        assert animal.status == (ADOPTED if animal.id in approved else AVAILABLE)
+        assert animal.adopter_id == approved.get(animal.id)
+    catalog = {e.animal_id for e in CatalogEntry.query}
+    assert catalog == {a.id for a in Animal.query.filter_by(status=AVAILABLE)}
+
+
+# Seed rows keep the old '12:33:27.24' timestamps until the migration pads
+# them; paging one row at a time must still see every notification once
+def test_feed_pages_across_legacy_timestamps(fresh_app):
+    run_schema_file('seed.sql')
+    normalize_timestamps()
+
+    expected = [note.id for note in feed_query('admin', 1)]
+    assert len(expected) > 2
+    seen, cursor = [], None
+    while True:
+        notifications, cursor = notification_page('admin', 1, cursor, limit=1)
+        seen += [note.id for note in notifications]
+        if cursor is None:
+            break
+        assert len(seen) <= len(expected)
+    assert seen == expected
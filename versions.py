@@ -0,0 +1,142 @@
+import hashlib
+import os
+from datetime import datetime
+from flask import current_app, request, session, make_response
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from models import db, ContentVersion
+from cache import TTLCache
+
+# ---------------------- Content Versions ----------------------
+# A change counter per scope, bumped in the same transaction as the write:
+#   ('shelters', 0)          list of approved shelters
+#   ('shelter', id)          a shelter's public details and animals
+#   ('user', id)             a user's/admin's own pages (notifications, requests)
+#   ('shelter_account', id)  a shelter's dashboard (notifications, pending requests)
+# Write routes call bump_version() (page_cache.invalidate_shelter for shelter
+# data); notify() bumps the recipients itself. Versions are cached in the
+# process for VERSION_CACHE_TTL seconds, kaya karamihan ng requests ay walang
+# query para dito. The writing process forgets its cached copy on commit;
+# other processes see the new version within VERSION_CACHE_TTL.
+
+VERSION_CACHE_TTL = 5
+
+version_cache = TTLCache(maxsize=10000, ttl=VERSION_CACHE_TTL)
+
+
+def principal_scope(role, principal_id):
+    return ('shelter_account' if role == 'shelter' else 'user', principal_id)
+
+
+def bump_version(scope, scope_id=0):
+    db.session.info.setdefault('pending_versions', set()).add((scope, scope_id or 0))
+
+
+# Returns {(scope, scope_id): (version, updated_at)}; never-bumped scopes are (0, None)
+def current_versions(scopes):
+    keys = [(scope, scope_id or 0) for scope, scope_id in scopes]
+    versions = {key: version_cache.get(key) for key in keys}
+    missing = [key for key, value in versions.items() if value is None]
+    if missing:
+        rows = db.session.execute(
+            db.select(ContentVersion.scope, ContentVersion.scope_id,
+                      ContentVersion.version, ContentVersion.updated_at)
+              .where(db.tuple_(ContentVersion.scope, ContentVersion.scope_id).in_(missing))
+        ).all()
+        loaded = {(row.scope, row.scope_id): (row.version, row.updated_at) for row in rows}
+        for key in missing:
+            versions[key] = loaded.get(key, (0, None))
+            version_cache.set(key, versions[key])
+    return versions
+
+
+# One INSERT ... ON CONFLICT DO UPDATE for every scope bumped in the transaction
+@event.listens_for(Session, 'before_commit')
+def _write_versions(session):
+    keys = session.info.get('pending_versions')
+    if not keys:
+        return
+    dialect = session.get_bind().dialect.name
+    insert = (postgresql if dialect == 'postgresql' else sqlite).insert
+    now = datetime.now()
+    statement = insert(ContentVersion).values([
+        {'scope': scope, 'scope_id': scope_id, 'version': 1, 'updated_at': now}
+        for scope, scope_id in sorted(keys)  # fixed order, walang deadlock
+    ])
+    session.execute(statement.on_conflict_do_update(
+        index_elements=['scope', 'scope_id'],
+        set_={'version': ContentVersion.version + 1, 'updated_at': statement.excluded.updated_at}
+    ))
+
+
+@event.listens_for(Session, 'after_commit')
+def _forget_versions(session):
+    for key in session.info.pop('pending_versions', ()):
+        version_cache.delete(key)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_versions(session):
+    session.info.pop('pending_versions', None)
+
+
+# ---------------------- Conditional GET ----------------------
+# Views call page_validators() first and return not_modified(...) if the
+# browser's copy is current, before any other query or rendering:
+#
+#     validators = page_validators([('shelter', shelter_id)])
+#     cached_response = not_modified(validators)
+#     if cached_response:
+#         return cached_response
+#     ...
+#     return add_validators(render_template(...), validators)
+#
+# The ETag covers the scopes' versions, the viewer (role + id, for the
+# navigation and per-user labels) and the deployed templates/assets. Only
+# If-None-Match is honoured: Last-Modified alone doesn't change when another
+# account logs in on the same browser.
+
+def deploy_version():
+    version = current_app.extensions.get('deploy_version')
+    if version is None:
+        digest = hashlib.sha1()
+        for folder in (current_app.template_folder, current_app.static_folder):
+            root = os.path.join(current_app.root_path, folder)
+            for dirpath, dirnames, filenames in sorted(os.walk(root)):
+                for name in sorted(filenames):
+                    if name.endswith(('.html', '.css', '.js')):
+                        with open(os.path.join(dirpath, name), 'rb') as f:
+                            digest.update(name.encode() + f.read())
+        version = current_app.extensions['deploy_version'] = digest.hexdigest()[:12]
+    return version
+
+
+def page_validators(scopes):
+    versions = current_versions(scopes)
+    viewer = (session.get('role'), session.get('user_id'))
+    state = (deploy_version(), viewer, sorted((key, version) for key, (version, _) in versions.items()))
+    etag = hashlib.sha1(repr(state).encode()).hexdigest()
+    stamps = [updated_at for _, updated_at in versions.values() if updated_at]
+    return etag, max(stamps) if stamps else None
+
+
+# 304 response if the browser already has this version, else None.
+# Pages with pending flash messages are always rendered.
+def not_modified(validators):
+    etag, _ = validators
+    if '_flashes' in session or not request.if_none_match.contains_weak(etag):
+        return None
+    return add_validators(current_app.response_class(status=304), validators)
+
+
+def add_validators(response, validators):
+    etag, last_modified = validators
+    response = make_response(response)
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified.astimezone()
+    # Stored by the browser only, and revalidated on every visit
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response